@@ -0,0 +1 @@
+"""Бенчмарки конвейера опрос → проверка → уведомление."""
@@ -0,0 +1,251 @@
+"""Бенчмарк конвейера на моках из tests/check_utils.
+
+Запуск: ``python -m benchmarks.pipeline --output bench.json``.
+Для каждого замера печатает ops/sec, p50/p99 задержки в секундах и
+пиковую память в байтах; результат — JSON для сравнения прогонов.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager, redirect_stderr
+from unittest import mock
+
+os.environ.setdefault('PRACTICUM_TOKEN', 'sometoken')
+os.environ.setdefault('TELEGRAM_TOKEN', '1234:abcdefg')
+os.environ.setdefault('TELEGRAM_CHAT_ID', '12345')
+
+import requests  # noqa: E402
+
+import homework  # noqa: E402
+from homework_bot.singleflight import SingleFlight  # noqa: E402
+from tests import check_utils  # noqa: E402
+
+PAYLOAD_SIZES = (1, 100, 10_000, 100_000)
+TENANT_COUNTS = (1, 100, 1_000, 10_000)
+QUICK_PAYLOAD_SIZES = (1, 100, 1_000)
+QUICK_TENANT_COUNTS = (1, 10, 100)
+STATUSES = tuple(homework.HOMEWORK_VERDICTS)
+MIN_TIME = 0.2
+
+
+def make_payload(size, current_date=1000198000):
+    """Ответ API с size работами."""
+    return {
+        'homeworks': [
+            {
+                'id': number,
+                'homework_name': f'hw{number}.zip',
+                'status': STATUSES[number % len(STATUSES)],
+                'reviewer_comment': 'Принято!',
+                'date_updated': '2021-04-11T10:31:09Z',
+                'lesson_name': 'Проект спринта',
+            }
+            for number in range(size)
+        ],
+        'current_date': current_date,
+    }
+
+
+class EncodedResponse(check_utils.MockResponseGET):
+    """MockResponseGET с телом в байтах, как у requests.Response.
+
+    Без ``content`` ResponseCache.decode берёт готовый словарь из
+    ``json()`` и ничего не разбирает и не хеширует.
+    """
+
+    def __init__(self, *args, body=b'', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.content = body
+        self.headers = {}
+
+
+def mock_get(payload):
+    """Подмена requests.get, возвращающая payload в виде JSON-тела."""
+    body = json.dumps(payload).encode()
+
+    def get(*args, **kwargs):
+        return EncodedResponse(
+            random_timestamp=payload['current_date'], data=payload, body=body
+        )
+    return get
+
+
+def measure(func, repeat):
+    """Задержки вызова func: не меньше repeat раз и MIN_TIME секунд."""
+    func()
+    latencies = []
+    started = time.perf_counter()
+    while (
+        len(latencies) < repeat
+        or time.perf_counter() - started < MIN_TIME
+    ):
+        call_started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_started)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    latencies.sort()
+    return {
+        'runs': len(latencies),
+        'ops_per_sec': len(latencies) / sum(latencies),
+        'p50': statistics.median(latencies),
+        'p99': latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)],
+        'peak_memory': peak,
+    }
+
+
+def bench_get_api_answer(size, repeat):
+    """get_api_answer на ответе из size работ."""
+    payload = make_payload(size)
+    with mock.patch.object(requests, 'get', mock_get(payload)):
+        return measure(lambda: homework.get_api_answer(0), repeat)
+
+
+def bench_check_response(size, repeat):
+    """check_response на ответе из size работ."""
+    payload = make_payload(size)
+    return measure(lambda: homework.check_response(payload), repeat)
+
+
+def bench_parse_status(size, repeat):
+    """parse_status для каждой из size работ."""
+    homeworks = make_payload(size)['homeworks']
+
+    def parse_all():
+        for status in homeworks:
+            homework.parse_status(status)
+    return measure(parse_all, repeat)
+
+
+def bench_send_message(_, repeat):
+    """send_message через MockTelegramBot."""
+    bot = check_utils.MockTelegramBot()
+    return measure(lambda: homework.send_message(bot, 'message'), repeat)
+
+
+@contextmanager
+def tenants_file(count):
+    """Файл TENANTS_FILE с count тенантами."""
+    with tempfile.NamedTemporaryFile('w', suffix='.json') as file:
+        json.dump(
+            [
+                {'token': f'token{number}', 'chat_id': number}
+                for number in range(count)
+            ],
+            file
+        )
+        file.flush()
+        yield file.name
+
+
+def bench_main_iteration(tenants, repeat, payload_size=1):
+    """Одна итерация main() для tenants тенантов.
+
+    Настройки, которые homework вычисляет из TENANTS_FILE при импорте,
+    выставляются явно, как в многотенантном режиме. Клиент API и кеш
+    общих запросов создаются заново, так что каждая итерация — первый
+    опрос всех тенантов.
+    """
+    payload = make_payload(payload_size)
+
+    def stop(_):
+        raise check_utils.BreakInfiniteLoop
+
+    def iteration():
+        homework.practicum_client = None
+        homework.single_flight = SingleFlight(homework.PRACTICUM_CACHE_TTL)
+        try:
+            homework.main()
+        except check_utils.BreakInfiniteLoop:
+            pass
+
+    with ExitStack() as stack:
+        path = stack.enter_context(tenants_file(tenants))
+        patches = {
+            'TENANTS_FILE': path,
+            'TELEGRAM_QUEUE': '0',
+            'STATE_DB': None,
+            'PIPELINE': '1',
+            'PRACTICUM_SINGLE_FLIGHT': '1',
+            'PRACTICUM_POOL_SIZE': homework.POLL_WORKERS,
+            'practicum_client': None,
+            'single_flight': homework.single_flight,
+        }
+        for name, value in patches.items():
+            stack.enter_context(mock.patch.object(homework, name, value))
+        stack.enter_context(
+            mock.patch('telebot.TeleBot', check_utils.MockTelegramBot)
+        )
+        for target in (requests, requests.Session):
+            stack.enter_context(
+                mock.patch.object(target, 'get', mock_get(payload))
+            )
+        stack.enter_context(mock.patch.object(time, 'sleep', stop))
+        return measure(iteration, repeat)
+
+
+PAYLOAD_BENCHMARKS = {
+    'get_api_answer': bench_get_api_answer,
+    'check_response': bench_check_response,
+    'parse_status': bench_parse_status,
+}
+
+
+def run(payload_sizes, tenant_counts, repeat):
+    """Прогнать все замеры и вернуть отчёт."""
+    results = []
+    for name, bench in PAYLOAD_BENCHMARKS.items():
+        for size in payload_sizes:
+            results.append(
+                dict(name=name, homeworks=size, **bench(size, repeat))
+            )
+    results.append(dict(name='send_message', **bench_send_message(1, repeat)))
+    for count in tenant_counts:
+        results.append(dict(
+            name='main_iteration', tenants=count,
+            **bench_main_iteration(count, repeat)
+        ))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='куда записать JSON (иначе stdout)')
+    parser.add_argument('--quick', action='store_true',
+                        help='малые размеры для быстрой проверки')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='минимум замеров на точку')
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+    with open(os.devnull, 'w') as devnull, redirect_stderr(devnull):
+        report = run(
+            QUICK_PAYLOAD_SIZES if args.quick else PAYLOAD_SIZES,
+            QUICK_TENANT_COUNTS if args.quick else TENANT_COUNTS,
+            args.repeat,
+        )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
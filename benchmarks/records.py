@@ -0,0 +1,143 @@
+"""Бенчмарк записей Homework против словарей из ответа API.
+
+Запуск: ``python -m benchmarks.records --output records.json``.
+Сравнивает прежний путь на словарях (check_response, проверки ключей
+parse_status и сравнение статусов по словарям) с однопроходной
+проверкой в ``HomeworkBatch``: ops/sec, задержки и процессорное время
+проверки вместе со сравнением статусов, а также память, которую
+занимают работы после разбора ответа.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.pipeline import homework, make_payload, measure
+from homework_bot.diff import diff_statuses
+
+SIZES = (100, 10_000, 100_000)
+QUICK_SIZES = (100, 1_000)
+
+
+def validate_dicts(response):
+    """Прежняя проверка: конверт ответа и ключи каждой работы."""
+    if not isinstance(response, dict) or 'homeworks' not in response:
+        raise TypeError('Некорректный ответ.')
+    homeworks = response['homeworks']
+    if not isinstance(homeworks, list):
+        raise TypeError('homeworks not list.')
+    for status in homeworks:
+        if 'homework_name' not in status:
+            raise KeyError('Нет ключа homework_name.')
+        if status['status'] not in homework.HOMEWORK_VERDICTS:
+            raise ValueError('Неизвестный статус работы.')
+    return homeworks
+
+
+def diff_dicts(known, homeworks):
+    """Прежнее сравнение статусов по словарям."""
+    seen = set()
+    transitions = []
+    for status in homeworks:
+        key = str(status.get('id', status.get('homework_name')))
+        if key in seen:
+            continue
+        seen.add(key)
+        new = status.get('status')
+        if known.get(key) != new:
+            transitions.append((key, status, known.get(key), new))
+    return transitions
+
+
+def cpu_time(func, runs):
+    """Процессорное время одного вызова func, среднее за runs вызовов."""
+    started = time.process_time()
+    for _ in range(runs):
+        func()
+    return (time.process_time() - started) / runs
+
+
+def retained(build):
+    """Байты, занятые результатом build() после сборки мусора."""
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+
+def bench(size, repeat):
+    """Замеры словарей и записей для ответа из size работ."""
+    payload = make_payload(size)
+    body = json.dumps(payload).encode()
+    known = {
+        str(status['id']): status['status']
+        for status in payload['homeworks']
+    }
+    variants = {
+        'dicts': (
+            lambda: diff_dicts(known, validate_dicts(payload)),
+            lambda: validate_dicts(json.loads(body)),
+        ),
+        'records': (
+            lambda: diff_statuses(known, homework.check_response(payload)),
+            lambda: homework.check_response(json.loads(body)),
+        ),
+    }
+    results = []
+    for name, (process, build) in variants.items():
+        result = measure(process, repeat)
+        result['cpu_time'] = cpu_time(process, result['runs'])
+        result['retained_memory'] = retained(build)
+        results.append(dict(name=name, homeworks=size, **result))
+    return results
+
+
+def run(sizes, repeat):
+    """Прогнать замеры и посчитать выигрыш записей."""
+    results = []
+    savings = []
+    for size in sizes:
+        dicts, records = bench(size, repeat)
+        results.extend((dicts, records))
+        savings.append({
+            'homeworks': size,
+            'speedup': records['ops_per_sec'] / dicts['ops_per_sec'],
+            'cpu_ratio': records['cpu_time'] / dicts['cpu_time'],
+            'memory_ratio': (
+                records['retained_memory'] / dicts['retained_memory']
+            ),
+        })
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+        'savings': savings,
+    }
+
+
+def main(argv=None):
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='куда записать JSON (иначе stdout)')
+    parser.add_argument('--quick', action='store_true',
+                        help='малые размеры для быстрой проверки')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='минимум замеров на точку')
+    args = parser.parse_args(argv)
+    report = run(QUICK_SIZES if args.quick else SIZES, args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,45 @@
-from asyncio import exceptions
+from collections import Counter, namedtuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from functools import partial
 from http import HTTPStatus
 import logging
 import os
+import signal
 import sys
+import threading
 import time
 
-import requests
-
 from dotenv import load_dotenv
-from telebot import TeleBot
+
+from homework_bot import exceptions
+from homework_bot.backfill import (
+    DEFAULT_CONCURRENCY, backfill, merge_statuses
+)
+from homework_bot.breaker import CircuitBreaker
+from homework_bot.conditional import ResponseCache
+from homework_bot.deadline import (
+    current_deadline, deadline_scope, using_deadline
+)
+from homework_bot.diff import diff_statuses
+from homework_bot.metrics import REGISTRY, start_http_server
+from homework_bot.digest import DigestBuffer, render_digest
+from homework_bot.fanout import FanOut
+from homework_bot.hedging import Hedger
+from homework_bot.outbound import OutboundQueue
+from homework_bot.pipeline import DEFAULT_MAXSIZE, Stage
+from homework_bot.poller import DEFAULT_WORKERS, SKIPPED, MultiTenantPoller
+from homework_bot.profiling import PROFILER
+from homework_bot.records import Homework, iter_records, parse_homeworks
+from homework_bot.scheduler import AdaptiveSchedule
+from homework_bot.sharding import ShardedRegistry, Supervisor, shard_tenants
+from homework_bot.singleflight import SingleFlight
+from homework_bot.state import open_state_store
+from homework_bot.streaming import StreamingAnswer
+from homework_bot.suppress import Suppressor, error_key
+from homework_bot.tenants import (
+    Tenant, current_tenant, load_tenants, tenant_context
+)
 
 load_dotenv()
 
@@ -16,11 +47,104 @@ load_dotenv()
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+TELEGRAM_SUBSCRIBERS = os.getenv('TELEGRAM_SUBSCRIBERS', '')
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+STATE_DB = os.getenv('STATE_DB')
+DIGEST_WINDOW = float(os.getenv('DIGEST_WINDOW', 0))
+TELEGRAM_QUEUE = os.getenv('TELEGRAM_QUEUE', '1' if TENANTS_FILE else '0')
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_FILE = os.getenv('LOG_FILE')
+LOG_FILE_MAX_BYTES = int(os.getenv('LOG_FILE_MAX_BYTES', 10 * 1024 * 1024))
+LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', 5))
+LOG_DEDUP_WINDOW = float(os.getenv('LOG_DEDUP_WINDOW', 300))
+ERROR_NOTIFY = os.getenv('ERROR_NOTIFY', '0')
+ERROR_NOTIFY_WINDOW = float(os.getenv('ERROR_NOTIFY_WINDOW', 3600))
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', 5))
+BREAKER_RESET = float(os.getenv('BREAKER_RESET', 60))
+PRACTICUM_CONNECT_TIMEOUT = float(os.getenv('PRACTICUM_CONNECT_TIMEOUT', 3.05))
+PRACTICUM_READ_TIMEOUT = float(os.getenv('PRACTICUM_READ_TIMEOUT', 10))
+PRACTICUM_HEDGE = os.getenv('PRACTICUM_HEDGE', '0')
+POLL_DEADLINE = float(os.getenv('POLL_DEADLINE', 30))
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', '0')
+PRACTICUM_SINGLE_FLIGHT = os.getenv(
+    'PRACTICUM_SINGLE_FLIGHT', '1' if TENANTS_FILE else '0'
+)
+PRACTICUM_CACHE_TTL = float(os.getenv('PRACTICUM_CACHE_TTL', 5))
+PIPELINE = os.getenv('PIPELINE', '1' if TENANTS_FILE else '0')
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', DEFAULT_MAXSIZE))
+SENDER_WORKERS = int(os.getenv('SENDER_WORKERS', 4))
+FANOUT_WORKERS = int(os.getenv('FANOUT_WORKERS', 8))
+WORKERS = int(os.getenv('WORKERS', 1))
+POLL_WORKERS = int(os.getenv('POLL_WORKERS', DEFAULT_WORKERS))
+PRACTICUM_POOL_SIZE = int(
+    os.getenv('PRACTICUM_POOL_SIZE', POLL_WORKERS if TENANTS_FILE else 0)
+)
 
 RETRY_PERIOD = 600
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+POLL_MIN_DELAY = int(os.getenv('POLL_MIN_DELAY', 60))
+POLL_MAX_DELAY = int(os.getenv('POLL_MAX_DELAY', 3600))
+ENDPOINT = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL')
+SHARD = None
+BACKFILL_CONCURRENCY = int(
+    os.getenv('BACKFILL_CONCURRENCY', DEFAULT_CONCURRENCY)
+)
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
+practicum_client = None
+error_suppressor = Suppressor(ERROR_NOTIFY_WINDOW)
+fanout = FanOut(FANOUT_WORKERS)
+single_flight = SingleFlight(PRACTICUM_CACHE_TTL)
+shared_tokens = frozenset()
+
+API_LATENCY = REGISTRY.histogram(
+    'practicum_request_seconds', 'Длительность запроса к API Практикума.'
+)
+SEND_LATENCY = REGISTRY.histogram(
+    'telegram_send_seconds', 'Длительность отправки сообщения в Telegram.'
+)
+VALIDATION_ERRORS = REGISTRY.counter(
+    'response_validation_errors_total',
+    'Ответы API, не прошедшие check_response.', ('type',)
+)
+NOTIFICATIONS = REGISTRY.counter(
+    'notifications_total', 'Уведомления о смене статуса.', ('verdict',)
+)
+DELIVERIES = REGISTRY.counter(
+    'telegram_deliveries_total',
+    'Отправки сообщения в отдельные чаты Telegram.',
+    ('result',)
+)
+REGISTRY.gauge(
+    'telegram_failing_chats',
+    'Чаты подписчиков, последняя отправка в которые не удалась.',
+    function=fanout.failing
+)
+REGISTRY.gauge(
+    'practicum_shared_answers',
+    'Ответы API, взятые из одновременного такого же запроса или кеша.',
+    function=lambda: sum(single_flight.stats()[key] for key in (
+        'shared', 'cached'
+    ))
+)
+LOOP_LAG = REGISTRY.gauge(
+    'loop_lag_seconds', 'Опоздание пробуждения основного цикла.'
+)
+REGISTRY.gauge(
+    'practicum_circuit_state',
+    'Выключатель API Практикума: 0 — замкнут, 1 — разомкнут, '
+    '2 — пробные запросы.',
+    function=lambda: get_practicum_client().breaker.state_code
+)
+
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -31,47 +155,173 @@ HOMEWORK_VERDICTS = {
 
 def check_tokens():
     """Проверка доступности переменных окружения."""
-    tokens = {
-        'PRACTICUM_TOKEN': PRACTICUM_TOKEN,
-        'TELEGRAM_TOKEN': TELEGRAM_TOKEN,
-        'TELEGRAM_CHAT_ID': TELEGRAM_CHAT_ID
-    }
+    tokens = {'TELEGRAM_TOKEN': TELEGRAM_TOKEN}
+    if not TENANTS_FILE:
+        tokens['PRACTICUM_TOKEN'] = PRACTICUM_TOKEN
+        tokens['TELEGRAM_CHAT_ID'] = TELEGRAM_CHAT_ID
     absent = []
     for token_name in tokens.keys():
         if not tokens[token_name]:
             absent.append(token_name)
     if absent:
-        logging.critical(f'Нет токенов {absent}')
+        logging.critical('Нет токенов %s', absent)
         return False
     return True
 
 
+def wait_delivery(future):
+    """Дождаться отправки из очереди за остаток дедлайна итерации.
+
+    Если сообщение не ушло вовремя, оно отменяется, пока ещё в очереди,
+    а вызывающий получает исключение: статус не будет сохранён.
+    """
+    deadline = current_deadline()
+    try:
+        future.result(None if deadline is None else deadline.remaining())
+    except (FutureTimeoutError, exceptions.DeadlineExceeded):
+        future.cancel()
+        raise
+
+
+def deliver(bot, message, chat_id):
+    """Отправить сообщение в один чат за остаток дедлайна итерации."""
+    if isinstance(bot, OutboundQueue):
+        wait_delivery(bot.send_message(chat_id, message))
+        return
+    deadline = current_deadline()
+    try:
+        with SEND_LATENCY.time():
+            if deadline is None:
+                bot.send_message(chat_id, message)
+            else:
+                bot.send_message(
+                    chat_id, message, timeout=deadline.remaining()
+                )
+    except Exception:
+        DELIVERIES.inc('failed')
+        raise
+    DELIVERIES.inc('sent')
+
+
+def broadcast(bot, tenant, message):
+    """Разослать сообщение студенту и подписчикам параллельно.
+
+    Сбой в чате подписчика логируется; исключение — только если
+    сообщение не дошло до самого студента.
+    """
+    logging.info('Начало рассылки в %s чатов.', len(tenant.chat_ids))
+    if isinstance(bot, OutboundQueue):
+        results = broadcast_queued(bot, tenant.chat_ids, message)
+    else:
+        results = fanout.send(
+            partial(deliver, bot, message), tenant.chat_ids
+        )
+    for chat_id, error in results.items():
+        if error is not None:
+            logging.error(
+                'Сообщение в чат %s не отправлено: %s', chat_id, error
+            )
+    if results[tenant.chat_id] is not None:
+        raise exceptions.TelegramError('Ошибка Telegram')
+    logging.debug('Сообщение разослано: %s', message)
+
+
+def broadcast_queued(queue, chat_ids, message):
+    """Поставить сообщение в очередь для всех чатов и дождаться отправки."""
+    futures = {
+        chat_id: queue.send_message(chat_id, message) for chat_id in chat_ids
+    }
+    results = {}
+    for chat_id, future in futures.items():
+        try:
+            wait_delivery(future)
+        except Exception as error:
+            results[chat_id] = error
+        else:
+            results[chat_id] = None
+    return results
+
+
 def send_message(bot, message):
     """Отправка сообщения."""
+    tenant = current_tenant()
+    if tenant is not None and len(tenant.chat_ids) > 1:
+        return broadcast(bot, tenant, message)
     try:
         logging.info('Начало отправки сообщения.')
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        chat_id = TELEGRAM_CHAT_ID if tenant is None else tenant.chat_id
+        deliver(bot, message, chat_id)
     except Exception:
         logging.error('Сообщение не отправлено, из-за ошибки.')
-        raise exceptions.ConnectinError('Ошибка Telegram')
+        raise exceptions.TelegramError('Ошибка Telegram')
     else:
-        logging.debug(f'Сообщение отправлено: {message}')
+        logging.debug('Сообщение отправлено: %s', message)
+
+
+def get_practicum_client():
+    """Клиент API Практикума; создаётся при первом обращении."""
+    global practicum_client
+    if practicum_client is None:
+        from homework_bot.client import PracticumClient
+
+        practicum_client = PracticumClient(
+            ENDPOINT, cache=ResponseCache(),
+            breaker=CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET),
+            timeout=(PRACTICUM_CONNECT_TIMEOUT, PRACTICUM_READ_TIMEOUT),
+            stream=STREAM_RESPONSES == '1'
+        )
+    return practicum_client
 
 
 def get_api_answer(local_time):
     """Получить статус домашней работы."""
+    client = get_practicum_client()
+    tenant = current_tenant()
+    token = PRACTICUM_TOKEN if tenant is None else tenant.token
+    key = None if tenant is None else tenant.key
+    if (
+        PRACTICUM_SINGLE_FLIGHT != '1' or client.stream
+        or token not in shared_tokens
+    ):
+        return request_api_answer(client, token, local_time, key)
+    deadline = current_deadline()
+    answer = single_flight.do(
+        (token, local_time),
+        partial(request_api_answer, client, token, local_time, shared=True),
+        None if deadline is None else deadline.remaining()
+    )
+    return client.cache.recognize(key, answer)
+
+
+def request_api_answer(client, token, local_time, key=None, shared=False):
+    """Запрос к API Практикума и разбор ответа.
+
+    ``key`` — тенант, чьи валидаторы подставить в условный запрос.
+    Общий для нескольких тенантов (``shared``) запрос делается без них,
+    а тело не разбирается: это сделает ``recognize`` для тех тенантов,
+    которым оно ещё не известно.
+    """
+    import requests
+
     try:
         logging.info('Начало запроса к API.')
-        api_answer = requests.get(
-            ENDPOINT,
-            headers=HEADERS,
-            params={'from_date': local_time}
-        )
-    except Exception:
-        raise exceptions.ConnectinError('Нет ответа')
+        with API_LATENCY.time():
+            api_answer = client.get(
+                token, local_time, current_deadline(), key
+            )
+    except requests.RequestException as error:
+        raise exceptions.APIConnectionError(f'Нет ответа: {error}')
+    if api_answer.status_code == HTTPStatus.NOT_MODIFIED:
+        return client.cache.not_modified(key, local_time)
+    if api_answer.status_code == HTTPStatus.OK and client.stream:
+        return StreamingAnswer(api_answer, key)
+    if api_answer.status_code == HTTPStatus.OK and shared:
+        return client.cache.share(api_answer)
     if api_answer.status_code == HTTPStatus.OK:
-        return api_answer.json()
-    raise exceptions.InvalidResponseCode('Нет ответа')
+        return client.cache.decode(key, api_answer)
+    raise exceptions.InvalidResponseCode(
+        f'API вернуло код {api_answer.status_code}'
+    )
 
 
 def check_response(response):
@@ -82,56 +332,540 @@ def check_response(response):
             f'{response}, type - {type(response)}'
         )
     if 'homeworks' not in response:
-        raise exceptions.AttributeError('Пустой API')
+        raise exceptions.EmptyResponseError('Пустой API')
     homeworks = response['homeworks']
     if not isinstance(homeworks, list):
         raise TypeError(
             'homeworks not list.'
             f'{homeworks}, type -{type(homeworks)}'
         )
-    return homeworks
+    return parse_homeworks(homeworks, HOMEWORK_VERDICTS)
 
 
 def parse_status(status):
     """Узнать статус."""
-    if 'homework_name' not in status:
-        raise KeyError('Нет ключа homework_name.')
-    verdict = status['status']
-    homework_name = status['homework_name']
-    if verdict not in HOMEWORK_VERDICTS:
-        raise ValueError('Неизвестный статус работы.')
+    if not isinstance(status, Homework):
+        status = Homework.from_dict(status, HOMEWORK_VERDICTS)
     return (
-        f'Изменился статус проверки работы "{homework_name}".'
-        f' {HOMEWORK_VERDICTS[verdict]}'
+        f'Изменился статус проверки работы "{status.name}".'
+        f' {status.verdict}'
+    )
+
+
+def find_shared_tokens(tenants):
+    """Токены Практикума, общие для нескольких тенантов."""
+    counts = Counter(tenant.token for tenant in tenants)
+    return frozenset(token for token, count in counts.items() if count > 1)
+
+
+def get_tenants():
+    """Список тенантов: из TENANTS_FILE или один из окружения."""
+    if TENANTS_FILE:
+        tenants = load_tenants(TENANTS_FILE)
+    else:
+        tenants = [Tenant(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, {
+            'subscribers': [
+                chat_id.strip() for chat_id in TELEGRAM_SUBSCRIBERS.split(',')
+                if chat_id.strip()
+            ]
+        })]
+    if SHARD is not None:
+        return shard_tenants(tenants, *SHARD)
+    return tenants
+
+
+def send_digest(bot, messages):
+    """Отправить уведомления одной сводкой."""
+    for text in render_digest(messages):
+        send_message(bot, text)
+
+
+def flush_digests(stage, digests):
+    """Передать этапу stage сводки, окно которых закрылось."""
+    for digest in digests.pop_due():
+        stage.put(digest)
+
+
+def digest_step(bot, store, digests, digest):
+    """Этап digest: отправить сводку за бюджет POLL_DEADLINE.
+
+    Статусы и курсор сохраняются только после отправки; неотправленная
+    сводка остаётся в буфере до следующего окна.
+    """
+    state = digest.state
+    with tenant_context(state.tenant), deadline_scope(POLL_DEADLINE):
+        try:
+            with PROFILER.stage('send'):
+                send_digest(bot, digest.messages)
+        except Exception as error:
+            digests.retry(state)
+            logging.error(
+                'Сводка для %s не отправлена: %s', state.tenant.name, error
+            )
+            return
+    record_statuses(store, state, digest.transitions)
+    if digest.cursor is not None:
+        store.set_cursor(state.tenant.key, digest.cursor)
+    store.flush()
+    digests.done(state)
+
+
+def report_error(bot, error):
+    """Сообщить тенанту о сбое, не повторяя его чаще ERROR_NOTIFY_WINDOW."""
+    if ERROR_NOTIFY != '1' or isinstance(error, exceptions.TelegramError):
+        return
+    tenant = current_tenant()
+    repeated = error_suppressor.check(
+        (None if tenant is None else tenant.key, *error_key(error))
+    )
+    if repeated is None:
+        return
+    message = f'Сбой в работе программы: {error}'
+    if repeated:
+        message += f' (повторилось ещё {repeated} раз)'
+    try:
+        send_message(bot, message)
+    except exceptions.TelegramError:
+        pass
+
+
+@contextmanager
+def reporting_errors(bot):
+    """Сообщить тенанту об ошибке блока и пробросить её дальше."""
+    try:
+        yield
+    except Exception as error:
+        report_error(bot, error)
+        raise
+
+
+def poll_tenant(bot, store, digests, state):
+    """Опросить API и уведомить тенанта за бюджет POLL_DEADLINE."""
+    with deadline_scope(POLL_DEADLINE), reporting_errors(bot):
+        poll_tenant_once(bot, store, digests, state)
+
+
+def poll_tenant_once(bot, store, digests, state):
+    """Опросить API и уведомить тенанта об изменении статуса."""
+    response = fetch(state)
+    if not getattr(response, 'unchanged', False):
+        with PROFILER.stage('validate'):
+            homeworks = validate(response)
+        notify_changes(bot, store, digests, state, homeworks)
+    finish_poll(store, state, response, digests)
+
+
+def fetch(state):
+    """Запросить у API изменения с курсора тенанта."""
+    if state.cursor is None:
+        state.cursor = int(time.time())
+    with PROFILER.stage('fetch'):
+        return get_api_answer(state.cursor)
+
+
+def finish_poll(store, state, response, digests=None):
+    """Подтвердить обработанный ответ и сдвинуть курсор тенанта.
+
+    Пока сводка тенанта не отправлена, курсор в хранилище не сдвигается:
+    после перезапуска её изменения придут снова.
+    """
+    get_practicum_client().cache.commit(response, state.tenant.key)
+    current_date = response.get('current_date')
+    if isinstance(current_date, int) and current_date != state.cursor:
+        state.cursor = current_date
+        if digests is None or not digests.hold(state, current_date):
+            store.set_cursor(state.tenant.key, current_date)
+    state.in_flight = False
+
+
+def validate(response):
+    """check_response с подсчётом ошибок по типу."""
+    if isinstance(response, StreamingAnswer):
+        return validate_stream(response)
+    try:
+        homeworks = check_response(response)
+    except Exception as error:
+        VALIDATION_ERRORS.inc(type(error).__name__)
+        raise
+    report_invalid(getattr(homeworks, 'errors', ()))
+    return homeworks
+
+
+def validate_stream(response):
+    """Записи из потокового ответа по мере разбора его тела."""
+    errors = []
+    try:
+        yield from iter_records(
+            response.homeworks(), HOMEWORK_VERDICTS, errors
+        )
+    except Exception as error:
+        VALIDATION_ERRORS.inc(type(error).__name__)
+        raise
+    report_invalid(errors)
+
+
+def report_invalid(errors):
+    """Посчитать и залогировать отброшенные работы."""
+    for _, error in errors:
+        VALIDATION_ERRORS.inc(type(error).__name__)
+    if errors:
+        logging.error(
+            'Пропущены работы с ошибками: %s',
+            '; '.join(f'#{index}: {error}' for index, error in errors)
+        )
+
+
+def find_changes(state, homeworks):
+    """Изменившиеся статусы работ и уведомления о них."""
+    if not homeworks:
+        logging.debug('Нет активных работ.')
+    with PROFILER.stage('parse'):
+        transitions = diff_statuses(state.statuses, homeworks)
+        messages = {
+            transition.key: parse_status(transition.homework)
+            for transition in transitions
+        }
+    return transitions, messages
+
+
+def record_statuses(store, state, transitions):
+    """Запомнить новые статусы работ тенанта."""
+    statuses = {}
+    for transition in transitions:
+        statuses[transition.key] = transition.new
+        NOTIFICATIONS.inc(transition.new)
+    state.statuses.update(statuses)
+    store.set_statuses(state.tenant.key, statuses)
+
+
+def notify_changes(bot, store, digests, state, homeworks):
+    """Уведомить тенанта об изменившихся статусах и запомнить их."""
+    transitions, messages = find_changes(state, homeworks)
+    if messages:
+        if digests is not None:
+            buffer_changes(digests, state, messages, transitions)
+            return
+        with PROFILER.stage('send'):
+            send_digest(bot, messages.values())
+        record_statuses(store, state, transitions)
+
+
+def buffer_changes(digests, state, messages, transitions):
+    """Отложить уведомления в сводку до отправки; статусы — в памяти."""
+    digests.add(state, messages, transitions)
+    state.statuses.update(
+        (transition.key, transition.new) for transition in transitions
     )
 
 
+PollJob = namedtuple('PollJob', ('state', 'deadline', 'done'))
+
+
+@contextmanager
+def pipeline_step(bot, job):
+    """Контекст и дедлайн опроса тенанта на этапе конвейера.
+
+    Ошибка завершает опрос: о ней узнают тенант и планировщик (job.done).
+    """
+    state = job.state
+    with tenant_context(state.tenant), using_deadline(job.deadline):
+        try:
+            yield state
+        except Exception as error:
+            state.in_flight = False
+            report_error(bot, error)
+            job.done.set_exception(error)
+            raise
+
+
+def fetch_step(bot, diff_stage, state):
+    """Этап fetch: запросить API и передать ответ этапу diff.
+
+    Вернуть Future, который завершится вместе с опросом тенанта.
+    """
+    if state.in_flight:
+        logging.debug(
+            'Прошлый ответ для %s ещё обрабатывается.', state.tenant.name
+        )
+        return SKIPPED
+    with deadline_scope(POLL_DEADLINE) as deadline, reporting_errors(bot):
+        response = fetch(state)
+    job = PollJob(state, deadline, Future())
+    state.in_flight = True
+    diff_stage.put((job, response))
+    return job.done
+
+
+def diff_step(bot, store, digests, send_stage, item):
+    """Этап diff: проверить ответ и найти изменившиеся статусы."""
+    job, response = item
+    with pipeline_step(bot, job) as state:
+        if not getattr(response, 'unchanged', False):
+            with PROFILER.stage('validate'):
+                homeworks = validate(response)
+            transitions, messages = find_changes(state, homeworks)
+            if messages and digests is None:
+                send_stage.put((job, response, transitions, messages))
+                return
+            if messages:
+                buffer_changes(digests, state, messages, transitions)
+        finish_poll(store, state, response, digests)
+        store.flush()
+    job.done.set_result(None)
+
+
+def send_step(bot, store, item):
+    """Этап send: отправить уведомления и завершить опрос тенанта."""
+    job, response, transitions, messages = item
+    with pipeline_step(bot, job) as state:
+        with PROFILER.stage('send'):
+            send_digest(bot, messages.values())
+        record_statuses(store, state, transitions)
+        finish_poll(store, state, response)
+        store.flush()
+    job.done.set_result(None)
+
+
+def export_depth(stage):
+    """Экспортировать глубину очереди этапа."""
+    REGISTRY.gauge(
+        f'pipeline_{stage.name}_queue_depth',
+        f'Элементы в очереди этапа {stage.name}.',
+        function=stage.depth
+    )
+    return stage
+
+
+def start_pipeline(bot, store, digests):
+    """Запустить этапы diff и send и экспортировать глубину очередей."""
+    send_stage = Stage(
+        'send', partial(send_step, bot, store), SENDER_WORKERS,
+        PIPELINE_QUEUE_SIZE
+    ).start()
+    diff_stage = Stage(
+        'diff', partial(diff_step, bot, store, digests, send_stage),
+        maxsize=PIPELINE_QUEUE_SIZE
+    ).start()
+    return [export_depth(diff_stage), export_depth(send_stage)]
+
+
+def start_digest_stage(bot, store, digests):
+    """Запустить этап отправки сводок вне основного цикла."""
+    return export_depth(Stage(
+        'digest', partial(digest_step, bot, store, digests), SENDER_WORKERS,
+        PIPELINE_QUEUE_SIZE
+    ).start())
+
+
+def build_step(bot, store, digests):
+    """Шаг опроса тенанта и запущенные этапы конвейера, если он включён."""
+    if PIPELINE != '1':
+        return partial(poll_tenant, bot, store, digests), []
+    stages = start_pipeline(bot, store, digests)
+    return partial(fetch_step, bot, stages[0]), stages
+
+
+def configure_clients(deadline=True):
+    """Настроить HTTP-клиенты Практикума и Telegram по окружению.
+
+    Если запросы идут под дедлайном итерации (deadline), повторы в
+    адаптере сессии выключены: их таймауты и паузы не укладываются в
+    бюджет, а упавший запрос повторит следующий опрос.
+    """
+    from homework_bot.client import DEFAULT_RETRIES, build_session
+    from telebot import apihelper
+
+    if TELEGRAM_API_URL:
+        apihelper.API_URL = TELEGRAM_API_URL
+    client = get_practicum_client()
+    if PRACTICUM_POOL_SIZE:
+        client.session = build_session(
+            PRACTICUM_POOL_SIZE, retries=0 if deadline else DEFAULT_RETRIES
+        )
+    if PRACTICUM_HEDGE == '1':
+        client.hedger = Hedger(max_workers=2 * POLL_WORKERS)
+
+
+def start_outbound_queue(bot):
+    """Запустить очередь отправки и экспортировать её метрики."""
+    queue = OutboundQueue(
+        bot, TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE,
+        latency=SEND_LATENCY, deliveries=DELIVERIES
+    ).start()
+    REGISTRY.gauge(
+        'telegram_queue_depth', 'Сообщения в очереди отправки.',
+        function=lambda: queue.stats()['depth']
+    )
+    REGISTRY.gauge(
+        'telegram_queue_wait_seconds_max',
+        'Наибольшее ожидание сообщения в очереди.',
+        function=lambda: queue.stats()['wait_max']
+    )
+    return queue
+
+
+def exit_on_sigterm():
+    """Завершать процесс по SIGTERM через SystemExit, выполняя finally."""
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(
+            signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum)
+        )
+
+
 def main():
     """Основа."""
+    global shared_tokens
+    from telebot import TeleBot
+
     if not check_tokens():
         sys.exit()
+    exit_on_sigterm()
+    configure_clients()
     bot = TeleBot(token=TELEGRAM_TOKEN)
-    prev_message = ''
-    prev_status = ''
-    while True:
-        try:
-            response = get_api_answer(int(time.time()))
-            message = check_response(response)
-            if not response['homeworks']:
-                logging.debug('Нет активных работ.')
-                message = 'Нет активных работ.'
-            else:
-                current_status = message[0].get('status')
-            if current_status != prev_status:
-                message = f'{HOMEWORK_VERDICTS[current_status]}'
-                prev_status = current_status
-            if prev_message != message:
-                send_message(bot, message)
-                prev_message = message
-        finally:
-            time.sleep(RETRY_PERIOD)
+    if TELEGRAM_QUEUE == '1':
+        bot = start_outbound_queue(bot)
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT)
+    PROFILER.directory = PROFILE_DIR
+    PROFILER.install()
+    store = open_state_store(STATE_DB)
+    digests = DigestBuffer(DIGEST_WINDOW) if DIGEST_WINDOW else None
+    step, stages = build_step(bot, store, digests)
+    if digests is not None:
+        digest_stage = start_digest_stage(bot, store, digests)
+        stages.append(digest_stage)
+    tenants = get_tenants()
+    shared_tokens = find_shared_tokens(tenants)
+    poller = MultiTenantPoller(
+        step, tenants, POLL_WORKERS,
+        schedule=AdaptiveSchedule(
+            RETRY_PERIOD, POLL_MIN_DELAY, POLL_MAX_DELAY
+        )
+    )
+    poller.restore(store)
+    try:
+        while True:
+            try:
+                poller.run_cycle()
+                if digests is not None:
+                    flush_digests(digest_stage, digests)
+                store.flush()
+            finally:
+                delay = poller.next_delay(RETRY_PERIOD)
+                if digests is not None:
+                    delay = digests.next_delay(delay)
+                wake_at = time.monotonic() + delay
+                time.sleep(delay)
+                LOOP_LAG.set(max(time.monotonic() - wake_at, 0))
+    finally:
+        poller.close()
+        for stage in stages:
+            stage.close()
+        fanout.close()
+        if isinstance(bot, OutboundQueue):
+            bot.close(POLL_DEADLINE)
+        store.close()
 
 
-if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO)
+def setup_logging():
+    """Писать логи через очередь в фоновом потоке."""
+    from homework_bot.logs import build_handlers, start_queue_logging
+
+    handler, _ = start_queue_logging(build_handlers(
+        LOG_FORMAT == 'json', LOG_FILE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS
+    ), LOG_DEDUP_WINDOW)
+    logging.basicConfig(level=LOG_LEVEL, handlers=[handler], force=True)
+
+
+def worker_metrics_port(shard):
+    """Порт /metrics воркера: следующие за METRICS_PORT."""
+    return METRICS_PORT + 1 + shard
+
+
+def run_worker(shard, shards):
+    """Воркер: опрашивает свою долю тенантов в отдельном процессе."""
+    global SHARD, METRICS_PORT, TELEGRAM_GLOBAL_RATE
+    SHARD = (shard, shards)
+    setup_logging()
+    TELEGRAM_GLOBAL_RATE /= shards
+    if METRICS_PORT:
+        METRICS_PORT = worker_metrics_port(shard)
     main()
+
+
+def run_sharded():
+    """Запустить WORKERS процессов-воркеров под надзором."""
+    if not check_tokens():
+        sys.exit()
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT, ShardedRegistry(
+            f'http://127.0.0.1:{worker_metrics_port(shard)}/metrics'
+            for shard in range(WORKERS)
+        ))
+    Supervisor(run_worker, WORKERS).run()
+
+
+def fetch_history(tenant):
+    """Вся история работ тенанта: статусы и курсор ответа."""
+    response = get_api_answer(0)
+    statuses = merge_statuses(validate(response))
+    return statuses, response.get('current_date')
+
+
+def run_backfill(argv):
+    """Команда --backfill: заполнить хранилище историей тенантов."""
+    global shared_tokens
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Загрузить историю работ тенантов в STATE_DB.'
+    )
+    parser.add_argument('--backfill', action='store_true')
+    parser.add_argument(
+        '--concurrency', type=int, default=BACKFILL_CONCURRENCY,
+        help='сколько тенантов загружать одновременно'
+    )
+    parser.add_argument(
+        '--tenant', action='append',
+        help='имя тенанта (можно несколько); по умолчанию все'
+    )
+    args = parser.parse_args(argv)
+    configure_clients(deadline=False)
+    tenants = get_tenants()
+    if args.tenant:
+        tenants = [tenant for tenant in tenants if tenant.name in args.tenant]
+    shared_tokens = find_shared_tokens(tenants)
+    store = open_state_store(STATE_DB)
+    try:
+        results = backfill(tenants, store, fetch_history, args.concurrency)
+    finally:
+        store.close()
+    failed = [result for result in results if result.error is not None]
+    logging.info(
+        'История загружена для %s из %s тенантов, работ: %s.',
+        len(results) - len(failed), len(results),
+        sum(result.homeworks for result in results)
+    )
+    return 1 if failed else 0
+
+
+def startup_profile():
+    """Напечатать время импорта homework и отложенных зависимостей."""
+    from homework_bot.startup import startup_report
+
+    print(startup_report(
+        'homework', os.path.dirname(os.path.abspath(__file__))
+    ))
+
+
+if __name__ == "__main__":
+    if '--startup-profile' in sys.argv[1:]:
+        startup_profile()
+        sys.exit()
+    setup_logging()
+    if '--backfill' in sys.argv[1:]:
+        sys.exit(run_backfill(sys.argv[1:]))
+    if WORKERS > 1:
+        run_sharded()
+    else:
+        main()
@@ -0,0 +1 @@
+"""Инфраструктура бота: мультитенантный опрос API Практикума."""
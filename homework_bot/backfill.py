@@ -0,0 +1,50 @@
+"""Загрузка всей истории работ тенантов в хранилище состояния."""
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from homework_bot.tenants import tenant_context
+
+DEFAULT_CONCURRENCY = 16
+
+BackfillResult = namedtuple(
+    'BackfillResult', ('tenant', 'homeworks', 'cursor', 'error')
+)
+
+
+def merge_statuses(homeworks):
+    """Статусы {ключ работы: статус}; из повторов берётся первый (свежий)."""
+    statuses = {}
+    for homework in homeworks:
+        statuses.setdefault(homework.key, homework.status)
+    return statuses
+
+
+def backfill(tenants, store, fetch, concurrency=DEFAULT_CONCURRENCY):
+    """Загрузить историю тенантов пулом из concurrency потоков.
+
+    ``fetch(tenant)`` вызывается в контексте тенанта и возвращает его
+    статусы {ключ работы: статус} и курсор ``current_date``. Ошибка
+    одного тенанта логируется и не мешает остальным; уведомления не
+    отправляются, чтобы следующий опрос сообщил только о новых
+    изменениях.
+    """
+    def load(tenant):
+        with tenant_context(tenant):
+            try:
+                statuses, cursor = fetch(tenant)
+            except Exception as error:
+                logging.error(
+                    'История %s не загружена: %s', tenant.name, error
+                )
+                return BackfillResult(tenant, 0, None, error)
+        store.set_statuses(tenant.key, statuses)
+        if isinstance(cursor, int):
+            store.set_cursor(tenant.key, cursor)
+        return BackfillResult(tenant, len(statuses), cursor, None)
+
+    workers = max(1, min(concurrency, len(tenants)))
+    with ThreadPoolExecutor(workers, thread_name_prefix='backfill') as pool:
+        results = list(pool.map(load, tenants))
+    store.flush()
+    return results
@@ -0,0 +1,77 @@
+"""Автоматический выключатель для запросов к API Практикума."""
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_CODES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitBreaker:
+    """Выключатель с состояниями closed, open и half_open.
+
+    После ``failure_threshold`` сбоев подряд выключатель размыкается, и
+    ``allow()`` отказывает без обращения к сети. Через ``reset_timeout``
+    секунд пропускается до ``half_open_calls`` пробных запросов: успех
+    замыкает выключатель, сбой снова размыкает.
+    """
+
+    def __init__(
+            self, failure_threshold=5, reset_timeout=60.0,
+            half_open_calls=1, clock=time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._trials = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state_code(self):
+        """Состояние числом для метрики."""
+        return STATE_CODES[self.state]
+
+    def allow(self):
+        """Можно ли сейчас выполнить запрос."""
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._trials = 0
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    return False
+                self._trials += 1
+            return True
+
+    def record_success(self):
+        """Запрос прошёл успешно."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Запрос завершился сбоем."""
+        with self._lock:
+            self.failures += 1
+            if (
+                self.state == HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self._opened_at = self.clock()
+
+    def seconds_until_retry(self):
+        """Сколько секунд выключатель ещё будет разомкнут."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0
+            return max(
+                self._opened_at + self.reset_timeout - self.clock(), 0
+            )
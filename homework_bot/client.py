@@ -0,0 +1,122 @@
+"""HTTP-клиент API Практикума с пулом keep-alive соединений."""
+import time
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from homework_bot.exceptions import CircuitOpenError, DeadlineExceeded
+
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_RETRIES = 2
+RETRY_STATUSES = (500, 502, 503, 504)
+TOO_MANY_REQUESTS = 429
+
+
+def build_session(pool_size, retries=DEFAULT_RETRIES, backoff_factor=0.5):
+    """Сессия requests с пулом соединений и повтором сбойных запросов."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=('GET',),
+            raise_on_status=False,
+        ),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class PracticumClient:
+    """Клиент эндпоинта homework_statuses.
+
+    Без сессии каждый запрос идёт через ``requests.get`` и открывает
+    новое соединение; с сессией из ``build_session`` соединения к
+    эндпоинту переиспользуются всеми потоками опроса. С кешем
+    ``ResponseCache`` запросы становятся условными. Выключатель
+    ``breaker`` считает сбоями ошибки соединения, 5xx и 429 и, пока
+    разомкнут, отказывает сразу с ``CircuitOpenError``.
+
+    ``timeout`` — пара (connect, read) в секундах; таймаут чтения
+    дополнительно урезается до остатка дедлайна итерации. С ``hedger``
+    медленный запрос дублируется. Со ``stream`` тело ответа не
+    читается сразу, а разбирается потоково (``StreamingAnswer``).
+    """
+
+    def __init__(
+            self, endpoint, session=None, cache=None, breaker=None,
+            timeout=DEFAULT_TIMEOUT, hedger=None, stream=False
+    ):
+        self.endpoint = endpoint
+        self.session = session
+        self.cache = cache
+        self.breaker = breaker
+        self.timeout = timeout
+        self.hedger = hedger
+        self.stream = stream
+
+    def get(self, token, from_date, deadline=None, key=None):
+        """Запросить статусы работ, изменившиеся после from_date.
+
+        ``key`` — ключ тенанта в кеше для условного запроса.
+        """
+        headers = {'Authorization': f'OAuth {token}'}
+        if self.cache is not None and key is not None:
+            headers.update(self.cache.conditional_headers(key))
+        connect_timeout, read_timeout = self.timeout
+        if deadline is not None:
+            connect_timeout = deadline.clamp(connect_timeout)
+            read_timeout = deadline.clamp(read_timeout)
+        request = partial(
+            self._request, headers, {'from_date': from_date},
+            (connect_timeout, read_timeout)
+        )
+        if self.breaker is None:
+            return self._send(request, deadline)
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                'API Практикума недоступно, повтор через '
+                f'{self.breaker.seconds_until_retry():.0f} с.'
+            )
+        try:
+            response = self._send(request, deadline)
+        except (requests.RequestException, DeadlineExceeded):
+            self.breaker.record_failure()
+            raise
+        status = response.status_code
+        if status >= 500 or status == TOO_MANY_REQUESTS:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _request(self, headers, params, timeout):
+        http = requests if self.session is None else self.session
+        kwargs = {'headers': headers, 'params': params, 'timeout': timeout}
+        if self.stream:
+            kwargs['stream'] = True
+        started = time.monotonic()
+        response = http.get(self.endpoint, **kwargs)
+        if self.hedger is not None:
+            self.hedger.observe(time.monotonic() - started)
+        return response
+
+    def _send(self, request, deadline):
+        if self.hedger is None:
+            return request()
+        return self.hedger.call(
+            request, None if deadline is None else deadline.remaining()
+        )
+
+    def close(self):
+        """Закрыть соединения пула."""
+        if self.session is not None:
+            self.session.close()
+        if self.hedger is not None:
+            self.hedger.close()
@@ -0,0 +1,164 @@
+"""Условные запросы к API и отпечатки ответов."""
+import hashlib
+import json
+import re
+import threading
+from collections import namedtuple
+
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*(-?\d+)')
+
+Validators = namedtuple('Validators', ('etag', 'last_modified', 'digest'))
+
+
+class ApiAnswer(dict):
+    """Ответ API и валидаторы, по которым его узнают в следующий раз.
+
+    ``key`` — чей это ответ в ``ResponseCache`` (ключ тенанта).
+    ``unchanged`` — тело совпало с последним обработанным ответом, и
+    в словаре только ``current_date`` и пустой список работ.
+    """
+
+    def __init__(self, data=(), key=None, validators=None, unchanged=False):
+        super().__init__(data)
+        self.key = key
+        self.validators = validators
+        self.unchanged = unchanged
+
+
+class SharedAnswer(ApiAnswer):
+    """Тело ответа, общее для тенантов с одним токеном.
+
+    Тело разбирается в ``ResponseCache.recognize`` один раз и только если
+    хотя бы одному тенанту оно ещё не известно.
+    """
+
+    def __init__(self, body, validators, current_date):
+        super().__init__(validators=validators)
+        self.body = body
+        self.current_date = current_date
+        self._data = None
+        self._lock = threading.Lock()
+
+    def data(self):
+        """Разобранное тело ответа."""
+        with self._lock:
+            if self._data is None:
+                self._data = json.loads(self.body)
+            return self._data
+
+
+def fingerprint(body):
+    """Хеш тела ответа без current_date и сам current_date."""
+    match = CURRENT_DATE.search(body)
+    current_date = None
+    if match:
+        current_date = int(match.group(1))
+        body = body[:match.start()] + body[match.end():]
+    return hashlib.blake2b(body, digest_size=16).digest(), current_date
+
+
+def header_validators(response, digest=None):
+    """Валидаторы из заголовков ответа и отпечаток тела digest."""
+    headers = getattr(response, 'headers', None) or {}
+    return Validators(
+        headers.get('ETag'), headers.get('Last-Modified'), digest
+    )
+
+
+class ResponseCache:
+    """Последние обработанные ответы API по ключам тенантов.
+
+    Запоминает ETag, Last-Modified и отпечаток тела. Ключ — тенант, а
+    не токен: тенанты с общим токеном ведут свои статусы и курсоры, и
+    ответ, обработанный одним, не должен считаться известным другому.
+    Валидаторы подставляются в следующий запрос только после
+    ``commit``: ответ, который не удалось обработать, не должен
+    считаться известным.
+    """
+
+    def __init__(self):
+        self._known = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            return self._known.get(key)
+
+    def conditional_headers(self, key):
+        """Заголовки If-None-Match/If-Modified-Since для ключа."""
+        known = self._get(key)
+        headers = {}
+        if known is not None:
+            if known.etag:
+                headers['If-None-Match'] = known.etag
+            if known.last_modified:
+                headers['If-Modified-Since'] = known.last_modified
+        return headers
+
+    def not_modified(self, key, from_date):
+        """Ответ на 304: изменений с from_date нет."""
+        return ApiAnswer(
+            {'homeworks': [], 'current_date': from_date},
+            key, self._get(key), unchanged=True
+        )
+
+    def decode(self, key, response):
+        """Разобрать тело ответа, если оно отличается от известного.
+
+        С ``key=None`` тело разбирается всегда, а валидаторы
+        сохраняются, чтобы ответ можно было узнать в ``recognize``.
+        """
+        body = getattr(response, 'content', None)
+        if not isinstance(body, bytes):
+            return ApiAnswer(response.json(), key)
+        digest, current_date = fingerprint(body)
+        validators = header_validators(response, digest)
+        if self._is_known(key, digest):
+            return ApiAnswer(
+                {'homeworks': [], 'current_date': current_date},
+                key, validators, unchanged=True
+            )
+        return ApiAnswer(json.loads(body), key, validators)
+
+    def share(self, response):
+        """Тело ответа для нескольких тенантов, без разбора."""
+        body = getattr(response, 'content', None)
+        if not isinstance(body, bytes):
+            return ApiAnswer(response.json())
+        digest, current_date = fingerprint(body)
+        return SharedAnswer(
+            body, header_validators(response, digest), current_date
+        )
+
+    def recognize(self, key, answer):
+        """Общий для нескольких тенантов ответ глазами тенанта key."""
+        validators = getattr(answer, 'validators', None)
+        if validators is None or answer.unchanged:
+            return answer
+        shared = isinstance(answer, SharedAnswer)
+        if self._is_known(key, validators.digest):
+            current_date = (
+                answer.current_date if shared else answer.get('current_date')
+            )
+            return ApiAnswer(
+                {'homeworks': [], 'current_date': current_date},
+                key, validators, unchanged=True
+            )
+        return ApiAnswer(answer.data() if shared else answer, key, validators)
+
+    def _is_known(self, key, digest):
+        if key is None or digest is None:
+            return False
+        known = self._get(key)
+        return known is not None and known.digest == digest
+
+    def commit(self, answer, key=None):
+        """Запомнить успешно обработанный ответ (для key или answer.key)."""
+        if key is None:
+            key = getattr(answer, 'key', None)
+        if (
+            key is not None and isinstance(answer, ApiAnswer)
+            and answer.validators is not None
+        ):
+            with self._lock:
+                self._known[key] = answer.validators
@@ -0,0 +1,49 @@
+"""Бюджет времени на одну итерацию опроса тенанта."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from homework_bot.exceptions import DeadlineExceeded
+
+_current_deadline = ContextVar('current_deadline', default=None)
+
+
+class Deadline:
+    """Момент, к которому итерация должна завершиться."""
+
+    def __init__(self, budget, clock=time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + budget
+
+    def remaining(self):
+        """Сколько секунд осталось; исключение, если бюджет исчерпан."""
+        left = self.expires_at - self.clock()
+        if left <= 0:
+            raise DeadlineExceeded('Бюджет времени итерации исчерпан.')
+        return left
+
+    def clamp(self, timeout):
+        """Таймаут, не выходящий за дедлайн."""
+        return min(timeout, self.remaining())
+
+
+def current_deadline():
+    """Дедлайн текущей итерации или None."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(budget):
+    """Выполнить блок с бюджетом budget секунд (None — без дедлайна)."""
+    with using_deadline(None if budget is None else Deadline(budget)) as scope:
+        yield scope
+
+
+@contextmanager
+def using_deadline(deadline):
+    """Выполнить блок с уже начатым дедлайном (например, на другом потоке)."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
@@ -0,0 +1,45 @@
+"""Поиск изменившихся статусов домашних работ."""
+from collections import namedtuple
+from itertools import compress
+from operator import ne
+
+from homework_bot.records import HomeworkBatch
+
+Transition = namedtuple('Transition', ('key', 'homework', 'old', 'new'))
+
+
+def diff_statuses(known, homeworks):
+    """Переходы статусов относительно известных known за один проход.
+
+    homeworks — записи ``Homework``, known — {ключ работы: статус}.
+    Если работа встречается в ответе несколько раз, учитывается первое
+    (самое свежее) вхождение. Для ``HomeworkBatch`` без повторов
+    статусы сравниваются по спискам, а записи собираются только для
+    изменившихся работ.
+    """
+    if isinstance(homeworks, HomeworkBatch):
+        keys = homeworks.keys
+        if len(set(keys)) == len(keys):
+            return _diff_batch(known, homeworks)
+    seen = set()
+    transitions = []
+    for homework in homeworks:
+        key = homework.key
+        if key in seen:
+            continue
+        seen.add(key)
+        new = homework.status
+        old = known.get(key)
+        if old != new:
+            transitions.append(Transition(key, homework, old, new))
+    return transitions
+
+
+def _diff_batch(known, batch):
+    keys, statuses = batch.keys, batch.statuses
+    old = list(map(known.get, keys))
+    changed = compress(range(len(keys)), map(ne, old, statuses))
+    return [
+        Transition(keys[index], batch[index], old[index], statuses[index])
+        for index in changed
+    ]
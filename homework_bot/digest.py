@@ -0,0 +1,126 @@
+"""Объединение уведомлений о статусах в сводные сообщения."""
+import threading
+import time
+from collections import namedtuple
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+def render_digest(messages, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Склеить сообщения построчно в тексты не длиннее limit."""
+    texts = []
+    current = ''
+    for message in messages:
+        candidate = f'{current}\n{message}' if current else message
+        if current and len(candidate) > limit:
+            texts.append(current)
+            candidate = message
+        current = candidate
+    if current:
+        texts.append(current)
+    return texts
+
+
+Digest = namedtuple('Digest', ('state', 'messages', 'transitions', 'cursor'))
+
+
+class _Pending:
+    """Накопленная сводка одного тенанта."""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.messages = {}
+        self.transitions = {}
+        self.cursor = None
+
+
+class DigestBuffer:
+    """Копит уведомления тенанта в течение окна window секунд.
+
+    Окно открывается первым уведомлением; повторное уведомление о той
+    же работе заменяет предыдущее, сохраняя его место в сводке. Вместе
+    с текстами копятся переходы статусов и курсор тенанта: сохранять
+    их можно только после отправки сводки (``done``); неотправленная
+    сводка возвращается в буфер через ``retry``.
+    """
+
+    def __init__(self, window, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._pending = {}
+        self._sending = {}
+        self._lock = threading.Lock()
+
+    def add(self, state, messages, transitions=()):
+        """Добавить уведомления {ключ работы: текст} в сводку тенанта."""
+        with self._lock:
+            entry = self._pending.get(state)
+            if entry is None:
+                entry = self._pending[state] = _Pending(
+                    self.clock() + self.window
+                )
+            entry.messages.update(messages)
+            entry.transitions.update(
+                (transition.key, transition) for transition in transitions
+            )
+
+    def hold(self, state, cursor):
+        """Отложить сохранение курсора до отправки сводки тенанта.
+
+        Вернуть False, если у тенанта нет неотправленной сводки.
+        """
+        with self._lock:
+            entry = self._pending.get(state) or self._sending.get(state)
+            if entry is None:
+                return False
+            entry.cursor = cursor
+            return True
+
+    def pop_due(self):
+        """Забрать сводки с истёкшим окном: [Digest]."""
+        now = self.clock()
+        with self._lock:
+            due = [
+                state for state, entry in self._pending.items()
+                if entry.deadline <= now and state not in self._sending
+            ]
+            digests = []
+            for state in due:
+                entry = self._sending[state] = self._pending.pop(state)
+                digests.append(Digest(
+                    state, list(entry.messages.values()),
+                    list(entry.transitions.values()), entry.cursor
+                ))
+            return digests
+
+    def done(self, state):
+        """Сводка тенанта отправлена."""
+        with self._lock:
+            self._sending.pop(state, None)
+
+    def retry(self, state):
+        """Вернуть неотправленную сводку в буфер до следующего окна."""
+        with self._lock:
+            entry = self._sending.pop(state, None)
+            if entry is None:
+                return
+            newer = self._pending.get(state)
+            if newer is None:
+                entry.deadline = self.clock() + self.window
+            else:
+                entry.deadline = newer.deadline
+                entry.messages.update(newer.messages)
+                entry.transitions.update(newer.transitions)
+                if newer.cursor is not None:
+                    entry.cursor = newer.cursor
+            self._pending[state] = entry
+
+    def next_delay(self, default):
+        """Секунды до закрытия ближайшего окна."""
+        with self._lock:
+            if not self._pending:
+                return default
+            deadline = min(
+                entry.deadline for entry in self._pending.values()
+            )
+        return max(min(round(deadline - self.clock(), 3), default), 0)
@@ -0,0 +1,29 @@
+"""Исключения бота."""
+
+
+class PracticumAPIError(Exception):
+    """Ошибка обращения к API Практикума."""
+
+
+class APIConnectionError(PracticumAPIError):
+    """API Практикума недоступно."""
+
+
+class InvalidResponseCode(PracticumAPIError):
+    """API Практикума вернуло код, отличный от 200."""
+
+
+class EmptyResponseError(PracticumAPIError):
+    """В ответе API нет ожидаемых ключей."""
+
+
+class TelegramError(Exception):
+    """Сообщение в Telegram не отправлено."""
+
+
+class CircuitOpenError(PracticumAPIError):
+    """Выключатель разомкнут: запрос к API не выполняется."""
+
+
+class DeadlineExceeded(Exception):
+    """Итерация не уложилась в бюджет времени."""
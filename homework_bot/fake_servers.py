@@ -0,0 +1,331 @@
+"""Локальные заглушки API Практикума и Telegram Bot API для нагрузки.
+
+Запуск::
+
+    python -m homework_bot.fake_servers both --latency 0.05 --error-rate 0.01
+
+Бот направляется на заглушки переменными окружения::
+
+    PRACTICUM_ENDPOINT=http://127.0.0.1:8081/api/user_api/homework_statuses/
+    TELEGRAM_API_URL=http://127.0.0.1:8082/bot{0}/{1}
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PRACTICUM_PATH = '/api/user_api/homework_statuses/'
+STATUS_FLOW = {
+    'reviewing': ('approved', 'rejected'),
+    'rejected': ('reviewing',),
+    'approved': (),
+}
+
+
+@dataclass
+class Faults:
+    """Задержка и доли ответов с ошибкой."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+
+    def delay(self, rng):
+        """Выдержать задержку ответа."""
+        pause = self.latency + rng.uniform(0, self.jitter)
+        if pause > 0:
+            time.sleep(pause)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, code, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def params(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qs(self.rfile.read(length).decode()))
+        return url.path, {key: values[-1] for key, values in params.items()}
+
+
+class FakePracticum:
+    """Заглушка эндпоинта homework_statuses.
+
+    У каждого токена ``homeworks`` работ; раз в ``transition_every``
+    секунд одна случайная работа случайного токена меняет статус по
+    ``STATUS_FLOW``. Сценарий ``script`` — список
+    ``{"at": секунды, "token": ..., "id": ..., "status": ...}`` —
+    задаёт переходы явно.
+    """
+
+    def __init__(
+            self, homeworks=10, transition_every=0.0, script=(),
+            faults=None, seed=None
+    ):
+        self.homeworks = homeworks
+        self.transition_every = transition_every
+        self.script = sorted(script, key=lambda step: step['at'])
+        self.faults = faults or Faults()
+        self.rng = random.Random(seed)
+        self.started = time.time()
+        self.requests = 0
+        self._tokens = {}
+        self._lock = threading.RLock()
+        self._script_position = 0
+        self._last_transition = self.started
+
+    def _works(self, token):
+        works = self._tokens.get(token)
+        if works is None:
+            works = self._tokens[token] = {
+                number: {
+                    'id': number,
+                    'status': 'reviewing',
+                    'homework_name': f'homework_{number}.zip',
+                    'reviewer_comment': '',
+                    'date_updated': int(self.started) - 1,
+                    'lesson_name': f'Спринт {number}',
+                }
+                for number in range(self.homeworks)
+            }
+        return works
+
+    def set_status(self, token, homework_id, status, now=None):
+        """Сменить статус работы."""
+        with self._lock:
+            work = self._works(token).setdefault(homework_id, {
+                'id': homework_id,
+                'homework_name': f'homework_{homework_id}.zip',
+                'reviewer_comment': '',
+                'lesson_name': '',
+            })
+            work['status'] = status
+            work['date_updated'] = now or time.time()
+
+    def _advance(self, now):
+        with self._lock:
+            self._advance_locked(now)
+
+    def _advance_locked(self, now):
+        while self._script_position < len(self.script):
+            step = self.script[self._script_position]
+            if self.started + step['at'] > now:
+                break
+            self._script_position += 1
+            self.set_status(step['token'], step['id'], step['status'], now)
+        if not self.transition_every or not self._tokens:
+            return
+        while self._last_transition + self.transition_every <= now:
+            self._last_transition += self.transition_every
+            works = self._works(self.rng.choice(list(self._tokens)))
+            candidates = [
+                work for work in works.values()
+                if STATUS_FLOW[work['status']]
+            ]
+            if candidates:
+                work = self.rng.choice(candidates)
+                work['status'] = self.rng.choice(STATUS_FLOW[work['status']])
+                work['date_updated'] = now
+
+    def answer(self, token, from_date):
+        """Тело ответа для токена и from_date."""
+        now = time.time()
+        self._advance(now)
+        with self._lock:
+            works = [
+                dict(work, date_updated=time.strftime(
+                    '%Y-%m-%dT%H:%M:%SZ', time.gmtime(work['date_updated'])
+                ))
+                for work in self._works(token).values()
+                if work['date_updated'] >= from_date
+            ]
+        works.reverse()
+        return {'homeworks': works, 'current_date': int(now)}
+
+    def handle(self, handler):
+        """Обработать запрос."""
+        with self._lock:
+            self.requests += 1
+        path, params = handler.params()
+        self.faults.delay(self.rng)
+        if path != PRACTICUM_PATH:
+            return handler.reply(404, {'message': 'Not found'})
+        auth = handler.headers.get('Authorization', '')
+        if not auth.startswith('OAuth '):
+            return handler.reply(401, {
+                'code': 'not_authenticated',
+                'message': 'Учетные данные не были предоставлены.',
+                'source': '__response__',
+            })
+        roll = self.rng.random()
+        if roll < self.faults.throttle_rate:
+            return handler.reply(
+                429, {'message': 'Too Many Requests'},
+                [('Retry-After', str(self.faults.retry_after))]
+            )
+        if roll < self.faults.throttle_rate + self.faults.error_rate:
+            return handler.reply(500, {'message': 'Internal error'})
+        try:
+            from_date = int(params.get('from_date', 0))
+        except ValueError:
+            return handler.reply(400, {
+                'code': 'UnknownError',
+                'error': {'error': 'Wrong from_date format'},
+            })
+        return handler.reply(200, self.answer(auth[6:], from_date))
+
+
+class FakeTelegram:
+    """Заглушка Telegram Bot API: sendMessage и лимит на чат.
+
+    Чат, получивший больше ``chat_rate`` сообщений за секунду, получает
+    429 с ``retry_after``. Отправленные сообщения копятся в ``sent``.
+    """
+
+    def __init__(self, chat_rate=1.0, faults=None, seed=None):
+        self.chat_rate = chat_rate
+        self.faults = faults or Faults()
+        self.rng = random.Random(seed)
+        self.sent = []
+        self.throttled = 0
+        self._last_sent = {}
+        self._lock = threading.Lock()
+
+    def _throttle(self, chat_id):
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_sent.get(chat_id)
+            if (
+                self.chat_rate and last is not None
+                and now - last < 1 / self.chat_rate
+            ) or self.rng.random() < self.faults.throttle_rate:
+                self.throttled += 1
+                return True
+            self._last_sent[chat_id] = now
+            return False
+
+    def handle(self, handler):
+        """Обработать запрос."""
+        path, params = handler.params()
+        self.faults.delay(self.rng)
+        method = path.rsplit('/', 1)[-1]
+        if method != 'sendMessage':
+            return handler.reply(404, {
+                'ok': False, 'error_code': 404, 'description': 'Not Found'
+            })
+        if self.rng.random() < self.faults.error_rate:
+            return handler.reply(500, {
+                'ok': False, 'error_code': 500,
+                'description': 'Internal Server Error',
+            })
+        chat_id = params.get('chat_id')
+        if self._throttle(chat_id):
+            retry_after = self.faults.retry_after
+            return handler.reply(429, {
+                'ok': False, 'error_code': 429,
+                'description': (
+                    f'Too Many Requests: retry after {retry_after}'
+                ),
+                'parameters': {'retry_after': retry_after},
+            })
+        with self._lock:
+            self.sent.append((chat_id, params.get('text')))
+            message_id = len(self.sent)
+        return handler.reply(200, {'ok': True, 'result': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': params.get('text'),
+        }})
+
+
+def serve(fake, port=0, host='127.0.0.1'):
+    """Запустить заглушку в фоновом потоке, вернуть HTTP-сервер."""
+    handler = type('Handler', (_Handler,), {
+        'do_GET': lambda self: fake.handle(self),
+        'do_POST': lambda self: fake.handle(self),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name=type(fake).__name__, daemon=True
+    ).start()
+    return server
+
+
+def _faults(args):
+    return Faults(
+        args.latency, args.jitter, args.error_rate, args.throttle_rate,
+        args.retry_after
+    )
+
+
+def main(argv=None):
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(description='Заглушки для нагрузки.')
+    parser.add_argument('mode', choices=('practicum', 'telegram', 'both'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--practicum-port', type=int, default=8081)
+    parser.add_argument('--telegram-port', type=int, default=8082)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='доля ответов 429')
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--homeworks', type=int, default=10,
+                        help='работ на токен (размер ответа)')
+    parser.add_argument('--transition-every', type=float, default=0.0,
+                        help='секунд между случайными сменами статуса')
+    parser.add_argument('--script', help='JSON-файл со сценарием переходов')
+    parser.add_argument('--chat-rate', type=float, default=1.0,
+                        help='сообщений в секунду на чат до 429')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+    servers = []
+    if args.mode in ('practicum', 'both'):
+        script = ()
+        if args.script:
+            with open(args.script, encoding='utf-8') as file:
+                script = json.load(file)
+        fake = FakePracticum(
+            args.homeworks, args.transition_every, script, _faults(args),
+            args.seed
+        )
+        servers.append(serve(fake, args.practicum_port, args.host))
+    if args.mode in ('telegram', 'both'):
+        fake = FakeTelegram(args.chat_rate, _faults(args), args.seed)
+        servers.append(serve(fake, args.telegram_port, args.host))
+    for server in servers:
+        host, port = server.server_address[:2]
+        print(f'Слушаю http://{host}:{port}', flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Параллельная отправка одного сообщения в несколько чатов."""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+DEFAULT_WORKERS = 8
+
+
+@dataclass
+class ChatDeliveries:
+    """Итоги отправки в один чат."""
+
+    sent: int = 0
+    failed: int = 0
+    last_error: str = None
+
+
+class FanOut:
+    """Пул отправителей для рассылки сообщения по чатам подписчиков.
+
+    ``send(chat_id)`` вызывается для всех чатов сразу, в контексте
+    вызывающего потока (тенант, дедлайн), поэтому задержка рассылки —
+    время самого медленного чата, а не сумма. Результат отправки
+    запоминается по каждому чату.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._chats = {}
+        self._lock = threading.Lock()
+
+    def send(self, send, chat_ids):
+        """Разослать по чатам; вернуть {чат: исключение или None}."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix='fanout'
+                )
+        futures = {
+            chat_id: self._executor.submit(
+                contextvars.copy_context().run, send, chat_id
+            )
+            for chat_id in chat_ids
+        }
+        results = {}
+        for chat_id, future in futures.items():
+            error = future.exception()
+            results[chat_id] = error
+            self._record(chat_id, error)
+        return results
+
+    def _record(self, chat_id, error):
+        with self._lock:
+            chat = self._chats.setdefault(chat_id, ChatDeliveries())
+            if error is None:
+                chat.sent += 1
+                chat.last_error = None
+            else:
+                chat.failed += 1
+                chat.last_error = str(error)
+
+    def stats(self):
+        """Итоги по чатам: {чат: ChatDeliveries}."""
+        with self._lock:
+            return {
+                chat_id: ChatDeliveries(**vars(chat))
+                for chat_id, chat in self._chats.items()
+            }
+
+    def failing(self):
+        """Число чатов, последняя отправка в которые не удалась."""
+        with self._lock:
+            return sum(
+                chat.last_error is not None for chat in self._chats.values()
+            )
+
+    def close(self):
+        """Остановить пул отправителей."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
@@ -0,0 +1,95 @@
+"""Хеджированные запросы: дубль медленного запроса после задержки p95."""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from homework_bot.exceptions import DeadlineExceeded
+
+DEFAULT_QUANTILE = 0.95
+DEFAULT_WINDOW = 256
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_WORKERS = 16
+
+
+class Hedger:
+    """Запускает второй такой же запрос, если первый дольше p95.
+
+    Задержка перед дублем — квантиль ``quantile`` последних ``window``
+    успешных задержек; пока замеров меньше ``min_samples``, дубли не
+    отправляются. Возвращается первый успешный ответ.
+
+    Каждому потоку опроса нужно до двух потоков пула: под основной
+    запрос и под дубль, поэтому ``max_workers`` задаётся вдвое больше
+    числа потоков опроса — иначе основной запрос ждёт свободного потока
+    и тратит на это задержку перед дублем.
+    """
+
+    def __init__(
+            self, quantile=DEFAULT_QUANTILE, window=DEFAULT_WINDOW,
+            min_samples=DEFAULT_MIN_SAMPLES, max_workers=DEFAULT_WORKERS
+    ):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.hedged = 0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='hedge'
+        )
+
+    def observe(self, seconds):
+        """Учесть задержку успешного запроса."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def delay(self):
+        """Задержка перед дублем или None, если замеров мало."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.quantile))
+        return ordered[index]
+
+    def call(self, func, timeout=None):
+        """Выполнить func() с дублем; timeout ограничивает ожидание.
+
+        Пока дублировать не по чему, func() выполняется в вызывающем
+        потоке.
+        """
+        delay = self.delay()
+        if delay is None:
+            return func()
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        hedge = timeout is None or delay < timeout
+        pending = {self._executor.submit(func)}
+        done, pending = wait(pending, timeout=delay if hedge else timeout)
+        if not done and hedge:
+            with self._lock:
+                self.hedged += 1
+            pending.add(self._executor.submit(func))
+        error = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                raise error
+            done, pending = wait(
+                pending, timeout=_left(expires_at),
+                return_when=FIRST_COMPLETED
+            )
+            if not done:
+                raise DeadlineExceeded('Запрос к API не уложился в таймаут.')
+
+    def close(self):
+        """Остановить пул потоков."""
+        self._executor.shutdown(wait=False)
+
+
+def _left(expires_at):
+    if expires_at is None:
+        return None
+    return max(0, expires_at - time.monotonic())
@@ -0,0 +1,117 @@
+"""Неблокирующее логирование: очередь, JSON, ротация файлов, тенант."""
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+from logging.handlers import (
+    QueueHandler, QueueListener, RotatingFileHandler
+)
+
+from homework_bot.suppress import DuplicateFilter
+from homework_bot.tenants import current_tenant
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(tenant)s] %(message)s'
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+
+class TenantFilter(logging.Filter):
+    """Добавляет в запись имя тенанта из контекста (или «-»)."""
+
+    def filter(self, record):
+        """Дописать record.tenant и пропустить запись."""
+        tenant = current_tenant()
+        record.tenant = '-' if tenant is None else tenant.name
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON."""
+
+    def format(self, record):
+        """Запись в виде JSON-объекта."""
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'tenant': getattr(record, 'tenant', '-'),
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Кладёт записи в очередь, не форматируя их в потоке вызова.
+
+    В вызывающем потоке подставляются только аргументы сообщения и
+    текст исключения; время и формат строки считает поток
+    ``QueueListener``.
+    """
+
+    def prepare(self, record):
+        """Копия записи, которую безопасно передать в другой поток."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+class SafeQueueListener(QueueListener):
+    """QueueListener, который можно останавливать повторно."""
+
+    def stop(self):
+        """Дописать оставшиеся записи и остановить поток."""
+        if self._thread is not None:
+            super().stop()
+
+
+def build_handlers(
+        json_format=False, path=None, max_bytes=DEFAULT_MAX_BYTES,
+        backups=DEFAULT_BACKUPS
+):
+    """Обработчики вывода: stderr и, если задан path, файл с ротацией."""
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if path:
+        handlers.append(RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups,
+            encoding='utf-8', delay=True
+        ))
+    formatter = JsonFormatter() if json_format else logging.Formatter(
+        TEXT_FORMAT
+    )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def start_queue_logging(handlers, dedup_window=0):
+    """Запустить фоновый поток записи логов.
+
+    Возвращает обработчик для корневого логгера и запущенный
+    ``QueueListener``; слушатель останавливается при выходе. С
+    ``dedup_window`` одинаковые предупреждения и ошибки пишутся не чаще
+    раза за окно.
+    """
+    records = queue.SimpleQueue()
+    listener = SafeQueueListener(
+        records, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    handler = AsyncQueueHandler(records)
+    handler.addFilter(TenantFilter())
+    if dedup_window:
+        handler.addFilter(DuplicateFilter(dedup_window))
+    return handler, listener
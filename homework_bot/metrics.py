@@ -0,0 +1,249 @@
+"""Метрики в формате Prometheus и HTTP-эндпоинт /metrics."""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    inner = ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return '{' + inner + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _check(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f'{self.name}: ожидались метки {self.labelnames}, '
+                f'получено {labels}'
+            )
+
+    def samples(self):
+        """Строки экспозиции без заголовков."""
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+            for labels, value in sorted(values.items())
+        ]
+
+    def render(self):
+        """Метрика в текстовом формате Prometheus."""
+        return '\n'.join([
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+            *self.samples(),
+        ])
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        """Увеличить счётчик с метками labels."""
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        """Текущее значение."""
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    """Значение, которое может расти и падать.
+
+    Если задана function, значение без меток читается при экспорте.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, *labels):
+        """Установить значение с метками labels."""
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels):
+        """Текущее значение."""
+        if self.function is not None:
+            return self.function()
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        """Строки экспозиции без заголовков."""
+        if self.function is not None:
+            return [f'{self.name} {_number(self.function())}']
+        return super().samples()
+
+
+class Histogram(_Metric):
+    """Распределение значений по корзинам."""
+
+    kind = 'histogram'
+
+    def __init__(
+            self, name, documentation, labelnames=(),
+            buckets=DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(map(float, sorted(buckets))) + (float('inf'),)
+
+    def observe(self, value, *labels):
+        """Учесть наблюдение value."""
+        self._check(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [
+                    [0] * len(self.buckets), 0.0, 0
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Замерить длительность блока."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels):
+        """Число наблюдений."""
+        series = self._values.get(labels)
+        return 0 if series is None else series[2]
+
+    def samples(self):
+        """Строки экспозиции без заголовков."""
+        with self._lock:
+            values = {
+                labels: (list(counts), total, count)
+                for labels, (counts, total, count) in self._values.items()
+            }
+        lines = []
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                label_text = _labels(
+                    self.labelnames, labels, [('le', _number(bound))]
+                )
+                lines.append(f'{self.name}_bucket{label_text} {cumulative}')
+            label_text = _labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_number(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Зарегистрировать счётчик (или вернуть уже созданный)."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        """Зарегистрировать измеритель."""
+        gauge = self._register(
+            Gauge(name, documentation, labelnames, function)
+        )
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(
+            self, name, documentation, labelnames=(),
+            buckets=DEFAULT_BUCKETS
+    ):
+        """Зарегистрировать гистограмму."""
+        return self._register(
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def start_http_server(port, registry=REGISTRY, host=''):
+    """Отдавать метрики по GET /metrics в фоновом потоке."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True
+    ).start()
+    return server
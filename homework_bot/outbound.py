@@ -0,0 +1,304 @@
+"""Очередь исходящих сообщений Telegram с ограничением частоты."""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+TOO_MANY_REQUESTS = 429
+DEFAULT_GLOBAL_RATE = 30
+DEFAULT_CHAT_RATE = 1
+DEFAULT_SENDERS = 4
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не больше capacity."""
+
+    def __init__(self, rate, capacity=None, now=0.0):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = now
+        self.blocked_until = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def delay(self, now):
+        """Сколько секунд ждать токена; 0 — токен есть."""
+        self._refill(now)
+        wait = 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def take(self, now):
+        """Забрать токен."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, until):
+        """Не выдавать токены до момента until."""
+        self.blocked_until = max(self.blocked_until, until)
+
+
+class Delivery(Future):
+    """Future отправки, который можно отменить, пока сообщение не уходит.
+
+    Сообщение, ждущее токена или повтора после 429, отменяется; во время
+    вызова ``bot.send_message`` — нет.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._sending = False
+        self._sending_lock = threading.Lock()
+
+    def cancel(self):
+        """Отменить отправку, если сообщение сейчас не отправляется."""
+        with self._sending_lock:
+            if self._sending:
+                return False
+            return super().cancel()
+
+    def start_sending(self):
+        """Начать попытку отправки; False, если сообщение отменено."""
+        with self._sending_lock:
+            if self.cancelled():
+                return False
+            self._sending = True
+            return True
+
+    def stop_sending(self):
+        """Попытка не удалась и будет повторена: отмена снова возможна."""
+        with self._sending_lock:
+            self._sending = False
+
+
+@dataclass
+class _Outgoing:
+    chat_id: str
+    text: str
+    enqueued_at: float
+    attempts: int = 0
+    future: Delivery = field(default_factory=Delivery)
+
+
+class _Chat:
+    """Очередь сообщений одного чата и его ведро токенов."""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.messages = deque()
+        self.scheduled = False
+        self.busy = False
+
+
+class OutboundQueue:
+    """Очередь перед ``bot.send_message`` с общим и початовым лимитом.
+
+    Объект подменяет бота: ``send_message(chat_id, text)`` только ставит
+    сообщение в очередь, а отправляют его потоки-отправители, соблюдая
+    общее ведро токенов на весь бот и отдельное ведро на каждый чат.
+    Сообщения одного чата уходят по порядку и не параллельно. На ответ
+    429 чат откладывается на ``retry_after`` секунд.
+
+    ``send_message`` возвращает ``Future``: он завершается, когда
+    сообщение отправлено, или исключением, когда попытки кончились.
+    Отменённое до отправки сообщение пропускается.
+
+    Если заданы latency (гистограмма) и deliveries (счётчик с меткой
+    результата), в них попадает длительность каждого вызова
+    ``bot.send_message`` и итог отправки: 'sent' или 'failed'.
+    """
+
+    def __init__(
+            self, bot, global_rate=DEFAULT_GLOBAL_RATE,
+            chat_rate=DEFAULT_CHAT_RATE, senders=DEFAULT_SENDERS,
+            max_attempts=DEFAULT_MAX_ATTEMPTS, clock=time.monotonic,
+            latency=None, deliveries=None
+    ):
+        self.bot = bot
+        self.latency = latency
+        self.deliveries = deliveries
+        self.chat_rate = chat_rate
+        self.senders = senders
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._global = TokenBucket(global_rate, now=clock())
+        self._chats = {}
+        self._ready = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._depth = 0
+        self._in_flight = 0
+        self._closed = False
+        self._threads = []
+        self._stats = dict.fromkeys(
+            ('sent', 'failed', 'retried', 'wait_total', 'wait_max'), 0
+        )
+
+    def start(self):
+        """Запустить потоки-отправители."""
+        for number in range(self.senders):
+            thread = threading.Thread(
+                target=self._run, name=f'telegram-sender-{number}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Поставить сообщение в очередь; Future завершится отправкой."""
+        with self._cond:
+            now = self.clock()
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                chat = self._chats[chat_id] = _Chat(
+                    TokenBucket(self.chat_rate, now=now)
+                )
+            outgoing = _Outgoing(chat_id, text, now)
+            chat.messages.append(outgoing)
+            self._depth += 1
+            if not (chat.scheduled or chat.busy):
+                self._schedule(chat_id, chat, now)
+        return outgoing.future
+
+    def _schedule(self, chat_id, chat, ready_at):
+        chat.scheduled = True
+        heapq.heappush(self._ready, (ready_at, next(self._seq), chat_id))
+        self._cond.notify()
+
+    def _next(self):
+        with self._cond:
+            while True:
+                if not self._ready:
+                    if self._closed and not self._in_flight:
+                        return None
+                    self._cond.wait()
+                    continue
+                now = self.clock()
+                ready_at, _, chat_id = self._ready[0]
+                if ready_at > now:
+                    self._cond.wait(ready_at - now)
+                    continue
+                chat = self._chats[chat_id]
+                self._drop_cancelled(chat)
+                if not chat.messages:
+                    heapq.heappop(self._ready)
+                    chat.scheduled = False
+                    continue
+                delay = max(self._global.delay(now), chat.bucket.delay(now))
+                if delay > 0:
+                    heapq.heapreplace(
+                        self._ready, (now + delay, next(self._seq), chat_id)
+                    )
+                    continue
+                if not chat.messages[0].future.start_sending():
+                    continue
+                heapq.heappop(self._ready)
+                self._global.take(now)
+                chat.bucket.take(now)
+                chat.scheduled = False
+                chat.busy = True
+                self._in_flight += 1
+                self._depth -= 1
+                outgoing = chat.messages.popleft()
+                waited = now - outgoing.enqueued_at
+                self._stats['wait_total'] += waited
+                self._stats['wait_max'] = max(self._stats['wait_max'], waited)
+                return chat, outgoing
+
+    def _drop_cancelled(self, chat):
+        """Убрать из начала очереди чата отменённые сообщения."""
+        while chat.messages and chat.messages[0].future.cancelled():
+            chat.messages.popleft()
+            self._depth -= 1
+
+    def _run(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            chat, outgoing = job
+            self._finish(chat, outgoing, self._deliver(outgoing))
+
+    def _deliver(self, outgoing):
+        """Отправить сообщение; вернуть паузу до повтора или None."""
+        outgoing.attempts += 1
+        try:
+            with self._timer():
+                self.bot.send_message(outgoing.chat_id, outgoing.text)
+        except Exception as error:
+            if (
+                getattr(error, 'error_code', None) == TOO_MANY_REQUESTS
+                and outgoing.attempts < self.max_attempts
+            ):
+                seconds = retry_after(error)
+                logging.warning(
+                    'Telegram ограничил чат %s, повтор через %s с.',
+                    outgoing.chat_id, seconds
+                )
+                return seconds
+            logging.error(
+                'Сообщение в чат %s не отправлено: %s', outgoing.chat_id, error
+            )
+            self._count('failed')
+            outgoing.future.set_exception(error)
+        else:
+            self._count('sent')
+            outgoing.future.set_result(None)
+        return None
+
+    def _timer(self):
+        return nullcontext() if self.latency is None else self.latency.time()
+
+    def _count(self, name):
+        with self._cond:
+            self._stats[name] += 1
+        if self.deliveries is not None:
+            self.deliveries.inc(name)
+
+    def _finish(self, chat, outgoing, retry_in):
+        with self._cond:
+            now = self.clock()
+            self._in_flight -= 1
+            chat.busy = False
+            if retry_in is not None:
+                self._stats['retried'] += 1
+                outgoing.future.stop_sending()
+                chat.messages.appendleft(outgoing)
+                self._depth += 1
+                chat.bucket.block(now + retry_in)
+                self._schedule(outgoing.chat_id, chat, now + retry_in)
+            elif chat.messages:
+                self._schedule(outgoing.chat_id, chat, now)
+            self._cond.notify_all()
+
+    def stats(self):
+        """Метрики очереди: глубина, отправлено, ожидание в секундах."""
+        with self._cond:
+            return dict(self._stats, depth=self._depth)
+
+    def close(self, timeout=None):
+        """Дождаться отправки очереди и остановить потоки."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+def retry_after(error, default=1):
+    """Пауза из ответа Telegram 429 (parameters.retry_after)."""
+    result = getattr(error, 'result_json', None) or {}
+    return result.get('parameters', {}).get('retry_after', default)
@@ -0,0 +1,67 @@
+"""Этапы конвейера, связанные ограниченными очередями."""
+import logging
+import queue
+import threading
+
+DEFAULT_MAXSIZE = 1000
+
+_STOP = object()
+
+
+class Stage:
+    """Пул потоков, разбирающий свою ограниченную очередь.
+
+    ``handler(item)`` вызывается для каждого элемента; его исключение
+    логируется и не останавливает этап. ``put`` блокируется, пока
+    очередь полна, — так медленный этап притормаживает предыдущий, а
+    память не растёт без предела.
+    """
+
+    def __init__(self, name, handler, workers=1, maxsize=DEFAULT_MAXSIZE):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self._queue = queue.Queue(maxsize)
+        self._threads = []
+
+    def start(self):
+        """Запустить потоки этапа."""
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f'{self.name}-{number}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def put(self, item, timeout=None):
+        """Передать элемент этапу, дождавшись места в очереди."""
+        self._queue.put(item, timeout=timeout)
+
+    def depth(self):
+        """Число элементов, ждущих обработки."""
+        return self._queue.qsize()
+
+    def join(self):
+        """Дождаться обработки всего, что уже в очереди."""
+        self._queue.join()
+
+    def close(self):
+        """Обработать оставшееся и остановить потоки."""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self.handler(item)
+            except Exception as error:
+                logging.error('Сбой на этапе %s: %s', self.name, error)
+            finally:
+                self._queue.task_done()
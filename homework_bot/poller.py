@@ -0,0 +1,129 @@
+"""Конкурентный опрос API Практикума для многих тенантов."""
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from homework_bot.tenants import tenant_context
+
+DEFAULT_WORKERS = 32
+SKIPPED = object()
+
+
+class TenantState:
+    """Изменяемое состояние одного тенанта между опросами."""
+
+    def __init__(self, tenant):
+        self.tenant = tenant
+        self.cursor = None
+        self.statuses = {}
+        self.errors = 0
+        self.idle_polls = 0
+        self.next_poll_at = float('-inf')
+        self.in_flight = False
+
+
+class MultiTenantPoller:
+    """Опрашивает всех тенантов пулом потоков, изолируя их ошибки.
+
+    ``step`` вызывается как ``step(state)`` в контексте тенанта.
+    Исключение одного тенанта логируется и не мешает остальным.
+    Если задано расписание ``schedule``, за цикл опрашиваются только
+    тенанты, чья пауза истекла.
+
+    Шаг, передавший опрос дальше (конвейеру), возвращает ``Future``:
+    ошибки и пауза тенанта учитываются, когда он завершится. Шаг,
+    пропустивший тенанта, возвращает ``SKIPPED`` — такой опрос не
+    считается ни успешным, ни пустым.
+    """
+
+    def __init__(
+            self, step, tenants, max_workers=DEFAULT_WORKERS,
+            schedule=None, clock=time.monotonic
+    ):
+        self.step = step
+        self.states = [TenantState(tenant) for tenant in tenants]
+        self.max_workers = max(1, min(max_workers, len(self.states) or 1))
+        self.schedule = schedule
+        self.clock = clock
+        self._executor = None
+        self._cycle_started = None
+
+    def restore(self, store):
+        """Восстановить курсоры и статусы работ из хранилища."""
+        cursors = store.load_cursors()
+        statuses = store.load_statuses()
+        for state in self.states:
+            key = state.tenant.key
+            state.cursor = cursors.get(key, state.cursor)
+            state.statuses = statuses.get(key, state.statuses)
+
+    def _run_one(self, state):
+        now = self._cycle_started
+        with tenant_context(state.tenant):
+            try:
+                result = self.step(state)
+            except Exception as error:
+                logging.error(
+                    'Сбой при опросе тенанта %s: %s', state.tenant.name, error
+                )
+                self._finish(state, False, now)
+                return False
+        if result is SKIPPED:
+            self._reschedule(state, now)
+            return False
+        if isinstance(result, Future):
+            self._reschedule(state, now)
+            result.add_done_callback(partial(self._complete, state))
+            return True
+        self._finish(state, True, now)
+        return True
+
+    def _complete(self, state, future):
+        self._finish(state, future.exception() is None, self.clock())
+
+    def _finish(self, state, ok, now):
+        """Учесть итог опроса тенанта и назначить следующий."""
+        if not ok:
+            state.errors += 1
+        else:
+            state.errors = 0
+            if self.schedule is not None:
+                state.idle_polls = (
+                    0 if self.schedule.is_active(state)
+                    else state.idle_polls + 1
+                )
+        self._reschedule(state, now)
+
+    def _reschedule(self, state, now):
+        if self.schedule is not None:
+            state.next_poll_at = now + self.schedule.next_delay(state)
+
+    def _poll(self, states):
+        if self.max_workers == 1 or len(states) == 1:
+            return [self._run_one(state) for state in states]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='poller'
+            )
+        return list(self._executor.map(self._run_one, states))
+
+    def run_cycle(self):
+        """Опросить тенантов, которым пора, вернуть число успешных."""
+        now = self._cycle_started = self.clock()
+        due = [state for state in self.states if state.next_poll_at <= now]
+        return sum(self._poll(due))
+
+    def next_delay(self, default):
+        """Секунды от начала последнего цикла до ближайшего опроса."""
+        if self.schedule is None or not self.states:
+            return default
+        next_poll_at = min(state.next_poll_at for state in self.states)
+        return max(round(next_poll_at - self._cycle_started, 3), 0)
+
+    def close(self):
+        """Остановить пул потоков."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
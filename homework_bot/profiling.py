@@ -0,0 +1,112 @@
+"""Профилирование работающего бота по сигналу."""
+import cProfile
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import nullcontext
+
+STAGES = ('fetch', 'validate', 'parse', 'send')
+
+
+class _Stage:
+    def __init__(self, profile):
+        self.profile = profile
+
+    def __enter__(self):
+        self.profile.enable()
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+
+
+class StageProfiler:
+    """cProfile по этапам конвейера, включаемый на лету.
+
+    Пока профилирование выключено, ``stage()`` возвращает один и тот же
+    пустой контекстный менеджер. Включённое — ведёт отдельный профиль на
+    каждую пару (этап, поток) и при выключении сохраняет по файлу pstats
+    на этап. Обработчик сигнала только будит поток ``profiler``: запись
+    файлов, логи и ``_lock`` внутри обработчика могли бы взаимно
+    заблокироваться с прерванным им кодом.
+    """
+
+    def __init__(self, directory='.'):
+        self.directory = directory
+        self.enabled = False
+        self._null = nullcontext()
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._toggle_requested = threading.Event()
+        self._thread = None
+
+    def stage(self, name):
+        """Контекст замера этапа name."""
+        if not self.enabled:
+            return self._null
+        key = (name, threading.get_ident())
+        profile = self._profiles.get(key)
+        if profile is None:
+            with self._lock:
+                profile = self._profiles.setdefault(key, cProfile.Profile())
+        return _Stage(profile)
+
+    def start(self):
+        """Начать профилирование."""
+        with self._lock:
+            self._profiles = {}
+            self.enabled = True
+        logging.info('Профилирование включено.')
+
+    def stop(self):
+        """Закончить профилирование и сохранить файлы, вернуть их пути."""
+        import pstats
+
+        with self._lock:
+            self.enabled = False
+            profiles, self._profiles = self._profiles, {}
+        by_stage = {}
+        for (name, _), profile in profiles.items():
+            by_stage.setdefault(name, []).append(profile)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        paths = []
+        os.makedirs(self.directory, exist_ok=True)
+        for name, stage_profiles in sorted(by_stage.items()):
+            stats = pstats.Stats(*stage_profiles)
+            path = os.path.join(self.directory, f'{name}-{stamp}.pstats')
+            stats.dump_stats(path)
+            paths.append(path)
+        logging.info('Профилирование выключено, файлы: %s', paths)
+        return paths
+
+    def toggle(self):
+        """Включить или выключить профилирование."""
+        if self.enabled:
+            self.stop()
+        else:
+            self.start()
+
+    def request_toggle(self, *signal_args):
+        """Обработчик сигнала: попросить поток profiler переключить замер."""
+        self._toggle_requested.set()
+
+    def _serve_toggles(self):
+        while True:
+            self._toggle_requested.wait()
+            self._toggle_requested.clear()
+            self.toggle()
+
+    def install(self, signum=getattr(signal, 'SIGUSR1', None)):
+        """Переключать профилирование сигналом signum."""
+        if signum is None:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._serve_toggles, name='profiler', daemon=True
+            )
+            self._thread.start()
+        signal.signal(signum, self.request_toggle)
+
+
+PROFILER = StageProfiler()
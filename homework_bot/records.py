@@ -0,0 +1,150 @@
+"""Компактные записи о домашних работах и их проверка за один проход."""
+from collections.abc import Sequence
+
+
+class Homework:
+    """Домашняя работа из ответа API: только поля, нужные боту.
+
+    ``key`` — ключ в хранилище (id, а без него — название), ``verdict`` —
+    текст вердикта для статуса. Записи со ``__slots__`` в несколько раз
+    меньше исходных словарей и не требуют повторных проверок ключей.
+    """
+
+    __slots__ = ('key', 'name', 'status', 'verdict')
+
+    def __init__(self, key, name, status, verdict):
+        self.key = key
+        self.name = name
+        self.status = status
+        self.verdict = verdict
+
+    def __eq__(self, other):
+        """Записи равны, если совпадают ключ, название и статус."""
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return (
+            (self.key, self.name, self.status)
+            == (other.key, other.name, other.status)
+        )
+
+    def __repr__(self):
+        """Запись для логов и отладки."""
+        return (
+            f'Homework(key={self.key!r}, name={self.name!r}, '
+            f'status={self.status!r})'
+        )
+
+    @classmethod
+    def from_dict(cls, item, verdicts):
+        """Запись из словаря API; исключение при первой же ошибке."""
+        record, problems = _parse(item, verdicts)
+        if problems:
+            raise problems[0]
+        return record
+
+
+class HomeworkBatch(Sequence):
+    """Проверенные работы одного ответа в параллельных списках.
+
+    ``keys``, ``names`` и ``statuses`` хранят строки из самого ответа,
+    а запись ``Homework`` собирается только при обращении к работе.
+    ``errors`` — список пар (номер работы в ответе, исключение).
+    """
+
+    def __init__(self, verdicts):
+        self.verdicts = verdicts
+        self.keys = []
+        self.names = []
+        self.statuses = []
+        self.errors = []
+
+    def __len__(self):
+        """Число корректных работ."""
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        """Запись ``Homework`` для работы с номером index."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        status = self.statuses[index]
+        return Homework(
+            self.keys[index], self.names[index], status,
+            self.verdicts[status]
+        )
+
+    def __iter__(self):
+        """Записи всех работ по порядку."""
+        verdicts = self.verdicts
+        for key, name, status in zip(self.keys, self.names, self.statuses):
+            yield Homework(key, name, status, verdicts[status])
+
+
+def _parse(item, verdicts):
+    if not isinstance(item, dict):
+        return None, [TypeError(
+            f'Работа должна быть словарём, получен {type(item).__name__}.'
+        )]
+    problems = []
+    name = item.get('homework_name')
+    status = item.get('status')
+    if name is None:
+        problems.append(KeyError('Нет ключа homework_name.'))
+    if not isinstance(status, str) or status not in verdicts:
+        problems.append(ValueError(f'Неизвестный статус работы: {status}.'))
+    if problems:
+        return None, problems
+    ident = item.get('id')
+    key = name if ident is None else str(ident)
+    return Homework(key, name, status, verdicts[status]), problems
+
+
+def iter_records(items, verdicts, errors):
+    """Записи ``Homework`` из работ items по одной.
+
+    Ошибки в отброшенных работах дописываются в список errors парами
+    (номер работы, исключение).
+    """
+    for index, item in enumerate(items):
+        if type(item) is dict:
+            name = item.get('homework_name')
+            status = item.get('status')
+            verdict = verdicts.get(status) if type(status) is str else None
+            if name is not None and verdict is not None:
+                ident = item.get('id')
+                yield Homework(
+                    name if ident is None else str(ident),
+                    name, status, verdict
+                )
+                continue
+        record, problems = _parse(item, verdicts)
+        if record is not None:
+            yield record
+        errors.extend((index, problem) for problem in problems)
+
+
+def parse_homeworks(items, verdicts):
+    """Проверить работы за один проход и собрать все ошибки.
+
+    Ключи, названия и статусы корректных работ попадают в списки
+    ``HomeworkBatch``, ошибки всех остальных — в ``errors`` результата.
+    """
+    batch = HomeworkBatch(verdicts)
+    add_key = batch.keys.append
+    add_name = batch.names.append
+    add_status = batch.statuses.append
+    for index, item in enumerate(items):
+        if type(item) is dict:
+            name = item.get('homework_name')
+            status = item.get('status')
+            if (
+                name is not None and type(status) is str
+                and status in verdicts
+            ):
+                ident = item.get('id')
+                add_key(name if ident is None else str(ident))
+                add_name(name)
+                add_status(status)
+                continue
+        _, problems = _parse(item, verdicts)
+        batch.errors.extend((index, problem) for problem in problems)
+    return batch
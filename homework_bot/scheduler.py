@@ -0,0 +1,52 @@
+"""Адаптивный интервал опроса тенанта."""
+import random
+
+ACTIVE_STATUSES = frozenset({'reviewing'})
+MAX_BACKOFF_EXPONENT = 32
+
+
+class AdaptiveSchedule:
+    """Выбирает паузу до следующего опроса тенанта.
+
+    - пока работа на проверке — ``min_delay``;
+    - без активных работ — ``base``, затем пауза растёт в ``idle_factor``
+      раз с каждым пустым опросом;
+    - после ошибок — экспоненциальный рост в ``error_factor`` раз со
+      случайной добавкой, чтобы тенанты не повторяли запросы разом.
+
+    Пауза всегда в пределах [min_delay, max_delay].
+    """
+
+    def __init__(
+            self, base, min_delay=60, max_delay=3600,
+            idle_factor=1.5, error_factor=2.0, rng=None
+    ):
+        if not min_delay <= base <= max_delay:
+            raise ValueError(
+                f'Нужно min_delay <= base <= max_delay, '
+                f'получено {min_delay}, {base}, {max_delay}'
+            )
+        self.base = base
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.idle_factor = idle_factor
+        self.error_factor = error_factor
+        self.rng = rng or random.Random()
+
+    def _grow(self, factor, steps):
+        steps = min(steps, MAX_BACKOFF_EXPONENT)
+        return min(self.max_delay, self.base * factor ** steps)
+
+    @staticmethod
+    def is_active(state):
+        """Есть ли у тенанта работы на проверке."""
+        return not ACTIVE_STATUSES.isdisjoint(state.statuses.values())
+
+    def next_delay(self, state):
+        """Пауза в секундах после опроса тенанта state."""
+        if state.errors:
+            ceiling = self._grow(self.error_factor, state.errors - 1)
+            return self.base + self.rng.uniform(0, ceiling - self.base)
+        if self.is_active(state):
+            return self.min_delay
+        return self._grow(self.idle_factor, max(state.idle_polls - 1, 0))
@@ -0,0 +1,266 @@
+"""Многопроцессный режим: шардирование тенантов и надзор за воркерами."""
+import bisect
+import hashlib
+import logging
+import os
+import re
+import signal
+import sys
+import time
+
+DEFAULT_REPLICAS = 64
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 60.0
+STABLE_UPTIME = 30.0
+SCRAPE_TIMEOUT = 2.0
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})? (.*)$')
+
+
+def _hash(value):
+    digest = hashlib.md5(value.encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class HashRing:
+    """Консистентное хеширование ключей тенантов по шардам.
+
+    У каждого шарда ``replicas`` виртуальных точек на кольце, поэтому
+    при изменении числа шардов переезжает около 1/N тенантов.
+    """
+
+    def __init__(self, shards, replicas=DEFAULT_REPLICAS):
+        if shards < 1:
+            raise ValueError('Нужен хотя бы один шард.')
+        self.shards = shards
+        points = sorted(
+            (_hash(f'{shard}:{replica}'), shard)
+            for shard in range(shards)
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key):
+        """Номер шарда, которому принадлежит ключ."""
+        index = bisect.bisect(self._hashes, _hash(key))
+        return self._shards[index % len(self._shards)]
+
+
+def shard_tenants(tenants, shard, shards):
+    """Тенанты, которых опрашивает шард shard из shards."""
+    ring = HashRing(shards)
+    return [
+        tenant for tenant in tenants if ring.shard_for(tenant.key) == shard
+    ]
+
+
+def _exit_on_signal(signum, frame):
+    sys.exit(128 + signum)
+
+
+def _worker_entry(target, shard, shards):
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    target(shard, shards)
+
+
+class Supervisor:
+    """Запускает ``target(shard, shards)`` в N процессах и следит за ними.
+
+    Упавший воркер перезапускается; если он прожил меньше
+    ``STABLE_UPTIME``, пауза перед перезапуском удваивается до
+    ``max_restart_delay``. SIGTERM и SIGINT останавливают всех воркеров,
+    SIGUSR1 пересылается им (переключение профилирования).
+
+    Воркер завершается по SIGTERM через SystemExit, чтобы его ``finally``
+    успел записать состояние и разослать очередь. Процессы запускаются
+    через spawn: у надзирателя уже работают потоки (логи, /metrics), и
+    fork скопировал бы их блокировки в непредсказуемом состоянии.
+    """
+
+    def __init__(
+            self, target, shards, restart_delay=RESTART_DELAY,
+            max_restart_delay=MAX_RESTART_DELAY, context=None,
+            clock=time.monotonic
+    ):
+        self.target = target
+        self.shards = shards
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        if context is None:
+            import multiprocessing
+
+            context = multiprocessing.get_context('spawn')
+        self.context = context
+        self.clock = clock
+        self.processes = [None] * shards
+        self.restarts = [0] * shards
+        self._started_at = [0.0] * shards
+        self._delays = [restart_delay] * shards
+        self._restart_at = [None] * shards
+        self._stopping = False
+
+    def _spawn(self, shard):
+        process = self.context.Process(
+            target=_worker_entry, args=(self.target, shard, self.shards),
+            name=f'worker-{shard}', daemon=False
+        )
+        process.start()
+        self.processes[shard] = process
+        self._started_at[shard] = self.clock()
+        self._restart_at[shard] = None
+        logging.info('Воркер %s запущен, pid %s.', shard, process.pid)
+
+    def start(self):
+        """Запустить всех воркеров."""
+        for shard in range(self.shards):
+            self._spawn(shard)
+        return self
+
+    def check(self):
+        """Перезапустить упавших воркеров; вернуть число перезапусков."""
+        restarted = 0
+        now = self.clock()
+        for shard, process in enumerate(self.processes):
+            if self._stopping or process.is_alive():
+                continue
+            if self._restart_at[shard] is None:
+                self._schedule_restart(shard, process, now)
+            if now >= self._restart_at[shard]:
+                self.restarts[shard] += 1
+                self._spawn(shard)
+                restarted += 1
+        return restarted
+
+    def _schedule_restart(self, shard, process, now):
+        if now - self._started_at[shard] >= STABLE_UPTIME:
+            self._delays[shard] = self.restart_delay
+        delay = self._delays[shard]
+        self._delays[shard] = min(delay * 2, self.max_restart_delay)
+        self._restart_at[shard] = now + delay
+        logging.error(
+            'Воркер %s (pid %s) завершился с кодом %s, '
+            'перезапуск через %.0f с.',
+            shard, process.pid, process.exitcode, delay
+        )
+
+    def signal(self, signum):
+        """Переслать сигнал всем живым воркерам."""
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                try:
+                    os.kill(process.pid, signum)
+                except ProcessLookupError:
+                    pass
+
+    def stop(self, timeout=10.0):
+        """Остановить воркеров: SIGTERM, затем SIGKILL по таймауту."""
+        self._stopping = True
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def _handle_stop(self, *signal_args):
+        self._stopping = True
+
+    def _handle_forward(self, signum, frame):
+        self.signal(signum)
+
+    def run(self, interval=1.0):
+        """Следить за воркерами до SIGTERM/SIGINT."""
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self._handle_forward)
+        self.start()
+        try:
+            while not self._stopping:
+                self.check()
+                time.sleep(interval)
+        finally:
+            self.stop()
+
+
+def _with_label(line, label):
+    match = _SAMPLE.match(line)
+    if match is None:
+        return line
+    name, labels, value = match.groups()
+    inner = label if not labels else f'{label},{labels[1:-1]}'
+    return f'{name}{{{inner}}} {value}'
+
+
+class ShardedRegistry:
+    """Сводные метрики воркеров: ответы их /metrics с меткой shard.
+
+    Совместим с ``start_http_server``: нужен только ``render()``.
+    Недоступный воркер пропускается и отмечается нулём в
+    ``worker_up``.
+    """
+
+    def __init__(self, urls, local=None, timeout=SCRAPE_TIMEOUT):
+        self.urls = list(urls)
+        self.local = local
+        self.timeout = timeout
+
+    def _scrape(self, url):
+        import urllib.request
+
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as reply:
+                return reply.read().decode()
+        except OSError as error:
+            logging.warning('Метрики %s недоступны: %s', url, error)
+            return None
+
+    def render(self):
+        """Метрики всех воркеров в текстовом формате Prometheus."""
+        headers = {}
+        samples = {}
+        up = []
+        for shard, url in enumerate(self.urls):
+            text = self._scrape(url)
+            up.append(f'worker_up{{shard="{shard}"}} {int(text is not None)}')
+            for line in (text or '').splitlines():
+                self._collect(line, shard, headers, samples)
+        lines = [
+            '# HELP worker_up Воркер ответил на сбор метрик.',
+            '# TYPE worker_up gauge',
+            *up,
+        ]
+        for family, header in headers.items():
+            lines.extend(header)
+            lines.extend(samples.get(family, ()))
+        text = '\n'.join(lines) + '\n'
+        if self.local is not None:
+            text += self.local.render()
+        return text
+
+    @staticmethod
+    def _collect(line, shard, headers, samples):
+        if line.startswith('# '):
+            family = line.split(' ', 3)[2]
+            header = headers.setdefault(family, [])
+            if len(header) < 2:
+                header.append(line)
+            return
+        match = _SAMPLE.match(line)
+        if match is None:
+            return
+        family = match.group(1)
+        for suffix in ('_bucket', '_sum', '_count'):
+            if family.endswith(suffix) and family[:-len(suffix)] in headers:
+                family = family[:-len(suffix)]
+                break
+        samples.setdefault(family, []).append(
+            _with_label(line, f'shard="{shard}"')
+        )
@@ -0,0 +1,95 @@
+"""Объединение одновременных одинаковых запросов в один."""
+import threading
+import time
+
+from homework_bot.exceptions import DeadlineExceeded
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+class _Call:
+    """Выполняющийся вызов, результата которого ждут другие потоки."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Один вызов на ключ, сколько бы потоков ни просили его сразу.
+
+    ``do(key, func)`` вызывает ``func()``, если для ``key`` ещё нет
+    выполняющегося вызова; иначе ждёт его и возвращает тот же результат
+    или то же исключение. Успешный результат ещё ``ttl`` секунд
+    отдаётся из кеша без вызова; хранится не больше ``max_entries``
+    результатов.
+    """
+
+    def __init__(self, ttl=0, max_entries=DEFAULT_MAX_ENTRIES,
+                 clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._calls = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(('calls', 'shared', 'cached'), 0)
+
+    def do(self, key, func, timeout=None):
+        """Результат func() для key, общий для одновременных вызовов.
+
+        ``timeout`` ограничивает ожидание чужого вызова; по его
+        истечении — ``DeadlineExceeded``.
+        """
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > self.clock():
+                self._stats['cached'] += 1
+                return cached[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['calls'] += 1
+            else:
+                self._stats['shared'] += 1
+        if not leader:
+            return self._wait(call, timeout)
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if self.ttl and call.error is None:
+                    self._store(key, call.result)
+            call.done.set()
+        return call.result
+
+    def _wait(self, call, timeout):
+        if not call.done.wait(timeout):
+            raise DeadlineExceeded('Не дождались общего запроса к API.')
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _store(self, key, result):
+        now = self.clock()
+        self._cache.pop(key, None)
+        self._cache[key] = (now + self.ttl, result)
+        if len(self._cache) > self.max_entries:
+            for stale in [
+                stale for stale, (until, _) in self._cache.items()
+                if until <= now
+            ]:
+                del self._cache[stale]
+            while len(self._cache) > self.max_entries:
+                del self._cache[next(iter(self._cache))]
+
+    def stats(self):
+        """Счётчики: собственные вызовы, ожидания чужих, ответы из кеша."""
+        with self._lock:
+            return dict(self._stats)
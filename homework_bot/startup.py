@@ -0,0 +1,48 @@
+"""Профиль холодного старта: время импорта модулей."""
+import re
+import subprocess
+import sys
+
+DEFERRED = ('requests', 'telebot')
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+
+
+def import_times(statement, cwd=None, executable=sys.executable):
+    """Выполнить statement с -X importtime в чистом интерпретаторе.
+
+    Возвращает список (модуль, собственное время, время с зависимостями,
+    глубина) в микросекундах в порядке завершения импорта.
+    """
+    result = subprocess.run(
+        [executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, cwd=cwd, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is not None:
+            own, cumulative, indent, name = match.groups()
+            rows.append((name, int(own), int(cumulative), len(indent) // 2))
+    return rows
+
+
+def startup_report(module, cwd=None, deferred=DEFERRED, top=10):
+    """Отчёт о времени импорта module и отложенных зависимостей."""
+    imports = '; '.join(f'import {name}' for name in (module, *deferred))
+    rows = import_times(imports, cwd)
+    roots = [index for index, row in enumerate(rows) if row[3] == 0]
+    cumulative = {rows[index][0]: rows[index][2] for index in roots}
+    lines = [f'Импорт {module}: {cumulative.get(module, 0) / 1000:.1f} мс']
+    for name in deferred:
+        lines.append(
+            f'  отложенный импорт {name}: '
+            f'{cumulative.get(name, 0) / 1000:.1f} мс'
+        )
+    end = next(index for index in roots if rows[index][0] == module)
+    begin = max((index for index in roots if index < end), default=-1) + 1
+    heaviest = sorted(rows[begin:end + 1], key=lambda row: -row[1])
+    lines.append(f'Самые долгие модули при импорте {module}, мс:')
+    for name, own, _, _ in heaviest[:top]:
+        lines.append(f'  {own / 1000:8.1f}  {name}')
+    return '\n'.join(lines)
@@ -0,0 +1,151 @@
+"""Хранилище состояния тенантов между перезапусками."""
+import threading
+from collections import defaultdict
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class MemoryStateStore:
+    """Состояние в памяти процесса; теряется при перезапуске.
+
+    Хранит курсор from_date каждого тенанта и последний известный
+    статус каждой его работы.
+    """
+
+    def __init__(self):
+        self._cursors = {}
+        self._statuses = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def load_cursors(self):
+        """Курсоры from_date всех тенантов: {ключ тенанта: timestamp}."""
+        with self._lock:
+            return dict(self._cursors)
+
+    def load_statuses(self):
+        """Статусы работ: {ключ тенанта: {id работы: статус}}."""
+        with self._lock:
+            return {
+                tenant: dict(statuses)
+                for tenant, statuses in self._statuses.items()
+            }
+
+    def set_cursor(self, tenant_key, from_date):
+        """Запомнить from_date для следующего опроса тенанта."""
+        with self._lock:
+            self._cursors[tenant_key] = from_date
+
+    def set_statuses(self, tenant_key, statuses):
+        """Запомнить статусы работ тенанта: {id работы: статус}."""
+        with self._lock:
+            self._statuses[tenant_key].update(statuses)
+
+    def flush(self):
+        """Записать накопленные изменения."""
+
+    def close(self):
+        """Освободить ресурсы хранилища."""
+
+
+class SQLiteStateStore(MemoryStateStore):
+    """Состояние в файле SQLite в режиме WAL.
+
+    Изменения копятся в памяти и пишутся одной транзакцией в ``flush``
+    или когда их набирается ``batch_size``.
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS cursors ('
+        ' tenant TEXT PRIMARY KEY,'
+        ' from_date INTEGER NOT NULL'
+        ');'
+        'CREATE TABLE IF NOT EXISTS statuses ('
+        ' tenant TEXT NOT NULL,'
+        ' homework TEXT NOT NULL,'
+        ' status TEXT NOT NULL,'
+        ' PRIMARY KEY (tenant, homework)'
+        ') WITHOUT ROWID;'
+    )
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        import sqlite3
+
+        super().__init__()
+        self.batch_size = batch_size
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(self.SCHEMA)
+        self._pending_cursors = {}
+        self._pending_statuses = {}
+
+    def load_cursors(self):
+        """Курсоры from_date всех тенантов: {ключ тенанта: timestamp}."""
+        self.flush()
+        with self._lock:
+            return dict(self._db.execute(
+                'SELECT tenant, from_date FROM cursors'
+            ))
+
+    def load_statuses(self):
+        """Статусы работ: {ключ тенанта: {id работы: статус}}."""
+        self.flush()
+        statuses = defaultdict(dict)
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT tenant, homework, status FROM statuses'
+            )
+            for tenant, homework, status in rows:
+                statuses[tenant][homework] = status
+        return dict(statuses)
+
+    def set_cursor(self, tenant_key, from_date):
+        """Запомнить from_date для следующего опроса тенанта."""
+        with self._lock:
+            self._pending_cursors[tenant_key] = from_date
+        self._flush_if_full()
+
+    def set_statuses(self, tenant_key, statuses):
+        """Запомнить статусы работ тенанта: {id работы: статус}."""
+        with self._lock:
+            for homework, status in statuses.items():
+                self._pending_statuses[tenant_key, homework] = status
+        self._flush_if_full()
+
+    def _flush_if_full(self):
+        pending = len(self._pending_cursors) + len(self._pending_statuses)
+        if pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Записать накопленные изменения одной транзакцией."""
+        with self._lock:
+            if not (self._pending_cursors or self._pending_statuses):
+                return
+            cursors, self._pending_cursors = self._pending_cursors, {}
+            statuses, self._pending_statuses = self._pending_statuses, {}
+            with self._db:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO cursors VALUES (?, ?)',
+                    cursors.items()
+                )
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO statuses VALUES (?, ?, ?)',
+                    (
+                        (tenant, homework, status)
+                        for (tenant, homework), status in statuses.items()
+                    )
+                )
+
+    def close(self):
+        """Записать изменения и закрыть соединение с базой."""
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+def open_state_store(path=None):
+    """SQLite-хранилище по пути path или хранилище в памяти."""
+    if path:
+        return SQLiteStateStore(path)
+    return MemoryStateStore()
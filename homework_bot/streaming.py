@@ -0,0 +1,135 @@
+"""Потоковый разбор ответа API без загрузки тела целиком."""
+import codecs
+import json
+import re
+
+from homework_bot.conditional import ApiAnswer, header_validators
+from homework_bot.exceptions import EmptyResponseError
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JsonReader:
+    """Читает JSON по одному значению из потока кусков байтов.
+
+    В памяти держится только недочитанный хвост буфера: значение
+    разбирается, как только его конец оказался в буфере.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._text.decode(b'', final=True)
+        else:
+            text = self._text.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Следующий значимый символ или '' в конце потока."""
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, *chars):
+        """Пропустить один из символов chars и вернуть его."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(
+                f'Ожидался один из {chars!r}', self._buffer, self._pos
+            )
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Следующее JSON-значение целиком."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(
+                    self._buffer, self._pos
+                )
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return value
+
+    def items(self):
+        """Элементы массива по одному."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.expect(']')
+            return
+        while True:
+            yield self.value()
+            if self.expect(',', ']') == ']':
+                return
+
+
+def read_answer(reader, answer):
+    """Работы из тела ответа; остальные поля — в словарь answer."""
+    if reader.peek() != '{':
+        raise TypeError(f'Ошибка в типе API: {type(reader.value())}')
+    reader.expect('{')
+    found = False
+    if reader.peek() == '}':
+        reader.expect('}')
+    else:
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key != 'homeworks':
+                answer[key] = reader.value()
+            elif reader.peek() == '[':
+                found = True
+                yield from reader.items()
+            else:
+                raise TypeError(f'homeworks not list: {reader.value()!r}')
+            if reader.expect(',', '}') == '}':
+                break
+    if not found:
+        raise EmptyResponseError('Пустой API')
+
+
+class StreamingAnswer(ApiAnswer):
+    """Ответ API, работы которого разбираются по мере чтения тела.
+
+    ``homeworks()`` можно перебрать один раз; остальные поля ответа
+    (``current_date``) появляются в словаре, когда разбор до них дойдёт.
+    Отпечаток тела не считается — для условных запросов остаются
+    ETag и Last-Modified.
+    """
+
+    def __init__(self, response, key=None, chunk_size=CHUNK_SIZE):
+        super().__init__(key=key, validators=header_validators(response))
+        self.response = response
+        self.chunk_size = chunk_size
+
+    def homeworks(self):
+        """Словари работ из тела ответа по одному."""
+        try:
+            yield from read_answer(
+                JsonReader(self.response.iter_content(self.chunk_size)),
+                self
+            )
+        finally:
+            self.response.close()
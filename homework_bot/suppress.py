@@ -0,0 +1,92 @@
+"""Подавление повторяющихся ошибок в логах и уведомлениях."""
+import logging
+import threading
+import time
+
+DEFAULT_MAX_KEYS = 10_000
+
+
+def error_key(error):
+    """Ключ ошибки: тип и текст."""
+    return type(error).__name__, str(error)
+
+
+class Suppressor:
+    """Пропускает событие с ключом не чаще раза в ``window`` секунд.
+
+    Повторы внутри окна подавляются и считаются; их число возвращается
+    при следующем пропущенном событии, чтобы дописать «повторилось N
+    раз». Хранится не больше ``max_keys`` ключей.
+    """
+
+    def __init__(self, window, max_keys=DEFAULT_MAX_KEYS,
+                 clock=time.monotonic):
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def check(self, key):
+        """Число подавленных повторов, если событие пропустить, иначе None."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and now < entry[0]:
+                entry[1] += 1
+                self._entries[key] = entry
+                return None
+            self._entries[key] = [now + self.window, 0]
+            if len(self._entries) > self.max_keys:
+                self._prune(now)
+            return 0 if entry is None else entry[1]
+
+    def _prune(self, now):
+        for key in [
+            key for key, (until, _) in self._entries.items() if until <= now
+        ]:
+            del self._entries[key]
+        while len(self._entries) > self.max_keys:
+            del self._entries[next(iter(self._entries))]
+
+
+def record_key(record):
+    """Ключ записи лога: шаблон и ошибки среди аргументов."""
+    args = record.args if isinstance(record.args, tuple) else ()
+    errors = tuple(
+        error_key(arg) for arg in args if isinstance(arg, BaseException)
+    )
+    if record.exc_info:
+        errors += (error_key(record.exc_info[1]),)
+    if errors:
+        return record.levelno, record.msg, errors
+    return record.levelno, record.getMessage()
+
+
+class DuplicateFilter(logging.Filter):
+    """Фильтр лога, подавляющий одинаковые записи от уровня ``level``.
+
+    Записи с ошибкой в аргументах сравниваются по шаблону и типу и
+    тексту ошибки, поэтому один сбой API у многих тенантов даёт одну
+    запись за окно.
+    """
+
+    def __init__(self, window, level=logging.WARNING, clock=time.monotonic):
+        super().__init__()
+        self.level = level
+        self.suppressor = Suppressor(window, clock=clock)
+
+    def filter(self, record):
+        """Пропустить запись или подавить повтор."""
+        if record.levelno < self.level:
+            return True
+        repeated = self.suppressor.check(record_key(record))
+        if repeated is None:
+            return False
+        if repeated:
+            record.msg = (
+                f'{record.getMessage()} (повторилось ещё {repeated} раз '
+                f'за {self.suppressor.window:.0f} с)'
+            )
+            record.args = None
+        return True
@@ -0,0 +1,73 @@
+"""Студенты (тенанты), которых обслуживает бот."""
+import hashlib
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+_current_tenant = ContextVar('current_tenant', default=None)
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """Пара токен Практикума / чат Telegram и её настройки."""
+
+    token: str
+    chat_id: str
+    options: dict = field(default_factory=dict, compare=False, hash=False)
+
+    @property
+    def name(self):
+        """Имя тенанта для логов."""
+        return self.options.get('name', str(self.chat_id))
+
+    @property
+    def chat_ids(self):
+        """Чат студента и чаты подписчиков (ментор, группа) без повторов."""
+        chats = [self.chat_id]
+        chats.extend(str(chat) for chat in self.options.get('subscribers', ()))
+        return list(dict.fromkeys(chats))
+
+    @property
+    def key(self):
+        """Стабильный ключ тенанта в хранилище, не раскрывающий токен.
+
+        Без опции ``id`` — хеш пары токен/чат: у студентов с общим
+        токеном Практикума ключи разные.
+        """
+        if 'id' in self.options:
+            return str(self.options['id'])
+        return hashlib.sha256(
+            f'{self.token}:{self.chat_id}'.encode()
+        ).hexdigest()[:16]
+
+
+def load_tenants(path):
+    """Прочитать список тенантов из JSON-файла."""
+    with open(path, encoding='utf-8') as file:
+        raw_tenants = json.load(file)
+    if not isinstance(raw_tenants, list):
+        raise TypeError(f'Ожидался список тенантов, получен {raw_tenants!r}')
+    tenants = []
+    for raw in raw_tenants:
+        options = {
+            key: value for key, value in raw.items()
+            if key not in ('token', 'chat_id')
+        }
+        tenants.append(Tenant(raw['token'], str(raw['chat_id']), options))
+    return tenants
+
+
+def current_tenant():
+    """Тенант, в контексте которого выполняется код."""
+    return _current_tenant.get()
+
+
+@contextmanager
+def tenant_context(tenant):
+    """Выполнить блок в контексте тенанта."""
+    token = _current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current_tenant.reset(token)
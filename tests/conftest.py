@@ -1,6 +1,8 @@
 import os
 import sys
+import threading
 
+import pytest
 import pytest_timeout
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -53,3 +55,71 @@ pytest_timeout.write = write_timeout_reasons
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingSession:
+    def __init__(self):
+        self.calls = []
+
+    @property
+    def kwargs(self):
+        return self.calls[-1][1]
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return 'response'
+
+
+class FloodError(Exception):
+    error_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__('Too Many Requests')
+        self.result_json = {'parameters': {'retry_after': retry_after}}
+
+
+class RecordingBot:
+    """Бот, запоминающий отправленные сообщения.
+
+    Первые ``floods`` отправок отвечают 429 с паузой ``retry_after``,
+    отправки в чаты из ``failing`` падают с ConnectionError.
+    """
+
+    def __init__(self):
+        self.floods = 0
+        self.retry_after = 0.01
+        self.failing = ()
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id, text, **kwargs):
+        if chat_id in self.failing:
+            raise ConnectionError(f'чат {chat_id} недоступен')
+        with self.lock:
+            if self.floods:
+                self.floods -= 1
+                raise FloodError(self.retry_after)
+            self.sent.append((chat_id, text))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def session():
+    return RecordingSession()
+
+
+@pytest.fixture
+def bot():
+    return RecordingBot()
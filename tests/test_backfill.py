@@ -0,0 +1,92 @@
+import threading
+import time
+
+from homework_bot.backfill import backfill, merge_statuses
+from homework_bot.records import Homework
+from homework_bot.state import MemoryStateStore, SQLiteStateStore
+from homework_bot.tenants import Tenant, current_tenant
+
+
+def tenants(count):
+    return [
+        Tenant(f'token{number}', str(number), {'id': number})
+        for number in range(count)
+    ]
+
+
+def test_merge_keeps_newest_duplicate():
+    assert merge_statuses([
+        Homework('1', 'hw1.zip', 'approved', None),
+        Homework('2', 'hw2.zip', 'reviewing', None),
+        Homework('1', 'hw1.zip', 'reviewing', None),
+    ]) == {'1': 'approved', '2': 'reviewing'}
+
+
+def test_backfill_seeds_store_with_bounded_concurrency():
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def fetch(tenant):
+        assert current_tenant() == tenant
+        with lock:
+            active.append(tenant)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(tenant)
+        return {f'hw-{tenant.key}': 'approved'}, 100 + int(tenant.key)
+
+    store = MemoryStateStore()
+    results = backfill(tenants(12), store, fetch, concurrency=3)
+    assert max(peak) == 3
+    assert [result.homeworks for result in results] == [1] * 12
+    assert store.load_cursors() == {str(n): 100 + n for n in range(12)}
+    assert store.load_statuses()['5'] == {'hw-5': 'approved'}
+
+
+def test_backfill_isolates_failed_tenant(tmp_path):
+    def fetch(tenant):
+        if tenant.key == '1':
+            raise ConnectionError('нет ответа')
+        return {'hw': 'reviewing'}, 7
+
+    store = SQLiteStateStore(str(tmp_path / 'state.db'))
+    results = backfill(tenants(3), store, fetch)
+    store.close()
+    assert [result.error is None for result in results] == [
+        True, False, True
+    ]
+    store = SQLiteStateStore(str(tmp_path / 'state.db'))
+    assert store.load_cursors() == {'0': 7, '2': 7}
+    store.close()
+
+
+def test_backfill_command(homework_module, monkeypatch, tmp_path):
+    path = str(tmp_path / 'state.db')
+    requested = []
+
+    def get_api_answer(from_date):
+        requested.append((current_tenant().key, from_date))
+        return {
+            'homeworks': [
+                {'id': 2, 'homework_name': 'hw2.zip', 'status': 'rejected'},
+                {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'},
+            ],
+            'current_date': 50,
+        }
+
+    monkeypatch.setattr(homework_module, 'STATE_DB', path)
+    monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+    monkeypatch.setattr(homework_module, 'get_tenants', lambda: tenants(4))
+    monkeypatch.setattr(
+        homework_module, 'configure_clients', lambda deadline: None
+    )
+    assert homework_module.run_backfill(
+        ['--backfill', '--concurrency', '2', '--tenant', '1', '--tenant', '3']
+    ) == 0
+    assert sorted(requested) == [('1', 0), ('3', 0)]
+    store = SQLiteStateStore(path)
+    assert store.load_cursors() == {'1': 50, '3': 50}
+    assert store.load_statuses()['3'] == {'1': 'approved', '2': 'rejected'}
+    store.close()
@@ -0,0 +1,29 @@
+import json
+
+from benchmarks import pipeline, records
+
+
+def test_pipeline_report_is_machine_readable(monkeypatch):
+    monkeypatch.setattr(pipeline, 'MIN_TIME', 0)
+    report = json.loads(json.dumps(pipeline.run((1, 10), (1, 3), repeat=2)))
+    names = {result['name'] for result in report['results']}
+    assert names == {
+        'get_api_answer', 'check_response', 'parse_status',
+        'send_message', 'main_iteration',
+    }
+    for result in report['results']:
+        assert result['runs'] >= 2
+        assert result['ops_per_sec'] > 0
+        assert 0 <= result['p50'] <= result['p99']
+        assert result['peak_memory'] >= 0
+
+
+def test_records_report_compares_memory(monkeypatch):
+    monkeypatch.setattr(pipeline, 'MIN_TIME', 0)
+    report = json.loads(json.dumps(records.run((10,), repeat=2)))
+    dicts, compact = report['results']
+    assert (dicts['name'], compact['name']) == ('dicts', 'records')
+    assert compact['retained_memory'] < dicts['retained_memory']
+    assert compact['cpu_time'] > 0
+    assert report['savings'][0]['homeworks'] == 10
+    assert report['savings'][0]['cpu_ratio'] > 0
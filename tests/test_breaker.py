@@ -0,0 +1,84 @@
+import pytest
+import requests
+
+from homework_bot.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from homework_bot.client import PracticumClient
+from homework_bot.exceptions import CircuitOpenError
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FlakySession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return Response(outcome)
+
+
+def test_opens_after_threshold_and_recovers(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10,
+                             clock=clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.seconds_until_retry() == 10
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow(), 'только один пробный запрос'
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.state_code == 0
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5,
+                             clock=clock)
+    breaker.record_failure()
+    clock.now = 5
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_client_fails_fast_while_open(clock):
+    session = FlakySession([
+        requests.ConnectionError('down'), 503, 200
+    ])
+    client = PracticumClient(
+        'http://practicum', session=session,
+        breaker=CircuitBreaker(2, 30, clock=clock)
+    )
+    with pytest.raises(requests.ConnectionError):
+        client.get('token', 0)
+    assert client.get('token', 0).status_code == 503
+    with pytest.raises(CircuitOpenError):
+        client.get('token', 0)
+    assert session.calls == 2
+    clock.now = 30
+    assert client.get('token', 0).status_code == 200
+    assert client.breaker.state == CLOSED
+
+
+def test_client_errors_do_not_trip_breaker():
+    session = FlakySession([401, 401, 401])
+    client = PracticumClient(
+        'http://practicum', session=session, breaker=CircuitBreaker(1)
+    )
+    for _ in range(3):
+        client.get('token', 0)
+    assert client.breaker.state == CLOSED
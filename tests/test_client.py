@@ -0,0 +1,58 @@
+import requests
+
+from homework_bot.client import PracticumClient, build_session
+
+ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+
+
+def test_build_session_configures_pool_and_retries():
+    session = build_session(pool_size=16, retries=3)
+    adapter = session.get_adapter(ENDPOINT)
+    assert adapter._pool_maxsize == 16
+    assert adapter.max_retries.total == 3
+    session.close()
+
+
+def test_session_retries_are_off_under_deadline(homework_module, monkeypatch):
+    monkeypatch.setattr(homework_module, 'PRACTICUM_POOL_SIZE', 4)
+    monkeypatch.setattr(homework_module, 'PRACTICUM_HEDGE', '1')
+    for deadline, retries in ((True, 0), (False, 2)):
+        monkeypatch.setattr(homework_module, 'practicum_client', None)
+        homework_module.configure_clients(deadline=deadline)
+        client = homework_module.practicum_client
+        assert client.session.get_adapter(ENDPOINT).max_retries.total == (
+            retries
+        )
+        assert client.hedger._executor._max_workers == (
+            2 * homework_module.POLL_WORKERS
+        )
+        client.close()
+
+
+def test_client_reuses_session(session):
+    client = PracticumClient(ENDPOINT, session=session)
+    assert client.get('abc', 10) == 'response'
+    assert client.get('xyz', 20) == 'response'
+    assert session.calls == [
+        (ENDPOINT, {
+            'headers': {'Authorization': 'OAuth abc'},
+            'params': {'from_date': 10},
+            'timeout': (3.05, 10),
+        }),
+        (ENDPOINT, {
+            'headers': {'Authorization': 'OAuth xyz'},
+            'params': {'from_date': 20},
+            'timeout': (3.05, 10),
+        }),
+    ]
+
+
+def test_client_without_session_uses_requests_get(monkeypatch, session):
+    monkeypatch.setattr(requests, 'get', session.get)
+    PracticumClient(ENDPOINT).get('abc', 10)
+    assert len(session.calls) == 1
+
+
+def test_streaming_client_does_not_read_body(session):
+    PracticumClient(ENDPOINT, session=session, stream=True).get('abc', 0)
+    assert session.calls[0][1]['stream'] is True
@@ -0,0 +1,201 @@
+import json
+
+import pytest
+
+from homework_bot import conditional
+from homework_bot.client import PracticumClient
+from homework_bot.conditional import ApiAnswer, ResponseCache, fingerprint
+from homework_bot.poller import TenantState
+from homework_bot.singleflight import SingleFlight
+from homework_bot.state import MemoryStateStore
+from homework_bot.tenants import Tenant, current_tenant, tenant_context
+
+
+class FakeResponse:
+    def __init__(self, data, headers=None):
+        self.content = json.dumps(data).encode()
+        self.headers = headers or {}
+
+    def json(self):
+        raise AssertionError('тело должно разбираться через кеш')
+
+
+def payload(current_date, homeworks=()):
+    return {'homeworks': list(homeworks), 'current_date': current_date}
+
+
+def test_fingerprint_ignores_current_date():
+    first, first_date = fingerprint(json.dumps(payload(1)).encode())
+    second, second_date = fingerprint(json.dumps(payload(2)).encode())
+    assert first == second
+    assert (first_date, second_date) == (1, 2)
+    other, _ = fingerprint(json.dumps(payload(1, [{'id': 1}])).encode())
+    assert other != first
+
+
+def test_identical_body_is_not_decoded_after_commit(monkeypatch):
+    cache = ResponseCache()
+    answer = cache.decode('token', FakeResponse(payload(1, [{'id': 1}])))
+    assert answer == payload(1, [{'id': 1}])
+    assert not answer.unchanged
+    repeated = cache.decode('token', FakeResponse(payload(2, [{'id': 1}])))
+    assert not repeated.unchanged, 'без commit ответ ещё не известен'
+    cache.commit(answer)
+    monkeypatch.setattr(json, 'loads', None)
+    repeated = cache.decode('token', FakeResponse(payload(2, [{'id': 1}])))
+    assert repeated.unchanged
+    assert repeated == payload(2)
+
+
+def test_validators_become_conditional_headers():
+    cache = ResponseCache()
+    assert cache.conditional_headers('token') == {}
+    answer = cache.decode('token', FakeResponse(
+        payload(1), {'ETag': '"abc"', 'Last-Modified': 'yesterday'}
+    ))
+    cache.commit(answer)
+    assert cache.conditional_headers('token') == {
+        'If-None-Match': '"abc"', 'If-Modified-Since': 'yesterday'
+    }
+    assert cache.conditional_headers('other') == {}
+    not_modified = cache.not_modified('token', 5)
+    assert not_modified.unchanged
+    assert not_modified == payload(5)
+
+
+def test_response_without_body_falls_back_to_json():
+    class MockResponse:
+        def json(self):
+            return payload(1)
+
+    answer = ResponseCache().decode('token', MockResponse())
+    assert isinstance(answer, ApiAnswer)
+    assert answer == payload(1)
+
+
+def test_shared_answer_is_recognized_per_key():
+    cache = ResponseCache()
+    shared = cache.share(FakeResponse(payload(1, [{'id': 1}])))
+    assert not shared.unchanged
+    first = cache.recognize('a', shared)
+    cache.commit(first, 'a')
+    assert cache.recognize('a', shared).unchanged
+    second = cache.recognize('b', shared)
+    assert not second.unchanged
+    assert second == payload(1, [{'id': 1}])
+
+
+@pytest.mark.parametrize('single_flight', ['0', '1'])
+def test_tenants_sharing_token_are_notified_independently(
+        homework_module, monkeypatch, single_flight
+):
+    body = json.dumps(payload(200, [
+        {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'}
+    ])).encode()
+
+    class Session:
+        def get(self, url, **kwargs):
+            response = FakeResponse({})
+            response.content = body
+            response.status_code = 200
+            return response
+
+    client = PracticumClient(
+        homework_module.ENDPOINT, session=Session(), cache=ResponseCache()
+    )
+    sent = []
+    monkeypatch.setattr(homework_module, 'practicum_client', client)
+    monkeypatch.setattr(
+        homework_module, 'PRACTICUM_SINGLE_FLIGHT', single_flight
+    )
+    monkeypatch.setattr(homework_module, 'single_flight', SingleFlight())
+    monkeypatch.setattr(
+        homework_module, 'send_message',
+        lambda bot, message: sent.append(current_tenant().chat_id)
+    )
+    store = MemoryStateStore()
+    tenants = [Tenant('shared', name) for name in ('a', 'b')]
+    monkeypatch.setattr(
+        homework_module, 'shared_tokens',
+        homework_module.find_shared_tokens(tenants)
+    )
+    assert tenants[0].key != tenants[1].key
+    for tenant in tenants:
+        state = TenantState(tenant)
+        state.cursor = 100
+        state.statuses = {'1': 'reviewing'}
+        with tenant_context(state.tenant):
+            homework_module.poll_tenant_once(None, store, None, state)
+        assert state.statuses == {'1': 'approved'}
+    assert sent == ['a', 'b']
+    assert store.load_cursors() == {tenant.key: 200 for tenant in tenants}
+
+
+class CountingJson:
+    def __init__(self):
+        self.loads_calls = 0
+
+    def loads(self, body):
+        self.loads_calls += 1
+        return json.loads(body)
+
+
+def poll_unchanged_body(homework_module, monkeypatch, tenants, polls):
+    body = json.dumps(payload(200, [
+        {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'}
+    ])).encode()
+    requests = []
+
+    class Session:
+        def get(self, url, **kwargs):
+            requests.append(kwargs['headers'])
+            response = FakeResponse({}, {'ETag': '"v1"'})
+            response.content = body
+            response.status_code = 200
+            return response
+
+    decoder = CountingJson()
+    monkeypatch.setattr(conditional, 'json', decoder)
+    monkeypatch.setattr(homework_module, 'practicum_client', PracticumClient(
+        homework_module.ENDPOINT, session=Session(), cache=ResponseCache()
+    ))
+    monkeypatch.setattr(homework_module, 'PRACTICUM_SINGLE_FLIGHT', '1')
+    monkeypatch.setattr(homework_module, 'single_flight', SingleFlight())
+    monkeypatch.setattr(
+        homework_module, 'shared_tokens',
+        homework_module.find_shared_tokens(tenants)
+    )
+    monkeypatch.setattr(
+        homework_module, 'send_message', lambda bot, message: None
+    )
+    states = [TenantState(tenant) for tenant in tenants]
+    for _ in range(polls):
+        for state in states:
+            state.cursor = 100
+            with tenant_context(state.tenant):
+                homework_module.poll_tenant_once(
+                    None, MemoryStateStore(), None, state
+                )
+    return requests, decoder.loads_calls
+
+
+def test_tenant_with_own_token_polls_conditionally(
+        homework_module, monkeypatch
+):
+    requests, loads_calls = poll_unchanged_body(
+        homework_module, monkeypatch, [Tenant('own', 'a')], 3
+    )
+    assert loads_calls == 1
+    assert [headers.get('If-None-Match') for headers in requests] == [
+        None, '"v1"', '"v1"'
+    ]
+
+
+def test_shared_body_is_decoded_only_for_tenants_that_miss_it(
+        homework_module, monkeypatch
+):
+    _, loads_calls = poll_unchanged_body(
+        homework_module, monkeypatch,
+        [Tenant('shared', 'a'), Tenant('shared', 'b')], 3
+    )
+    assert loads_calls == 2
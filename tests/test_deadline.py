@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from homework_bot.client import PracticumClient
+from homework_bot.deadline import Deadline, current_deadline, deadline_scope
+from homework_bot.exceptions import DeadlineExceeded
+from homework_bot.hedging import Hedger
+
+
+def test_deadline_clamps_and_expires(clock):
+    deadline = Deadline(5, clock=clock)
+    assert deadline.clamp(10) == 5
+    clock.now = 4
+    assert deadline.clamp(3.05) == 1
+    clock.now = 5
+    with pytest.raises(DeadlineExceeded):
+        deadline.remaining()
+
+
+def test_deadline_scope_is_reset():
+    assert current_deadline() is None
+    with deadline_scope(30) as deadline:
+        assert current_deadline() is deadline
+    assert current_deadline() is None
+    with deadline_scope(None):
+        assert current_deadline() is None
+
+
+def test_client_clamps_timeouts_to_deadline(clock, session):
+    client = PracticumClient('url', session=session, timeout=(3.05, 10))
+    client.get('token', 0, Deadline(2, clock=clock))
+    assert session.kwargs['timeout'] == (2, 2)
+
+
+def test_hedger_waits_for_samples():
+    hedger = Hedger(min_samples=3)
+    assert hedger.delay() is None
+    assert hedger.call(lambda: 'ok') == 'ok'
+    assert hedger.hedged == 0
+    hedger.close()
+
+
+def test_hedger_returns_faster_duplicate():
+    hedger = Hedger(min_samples=1)
+    hedger.observe(0.01)
+    release = threading.Event()
+    calls = []
+
+    def request():
+        calls.append(None)
+        if len(calls) == 1:
+            release.wait(1)
+            return 'slow'
+        return 'fast'
+
+    assert hedger.call(request, timeout=1) == 'fast'
+    assert hedger.hedged == 1
+    release.set()
+    hedger.close()
+
+
+def test_hedger_gives_up_after_timeout():
+    hedger = Hedger(min_samples=1)
+    hedger.observe(0.01)
+    release = threading.Event()
+    with pytest.raises(DeadlineExceeded):
+        hedger.call(lambda: release.wait(1), timeout=0.05)
+    release.set()
+    hedger.close()
+
+
+def test_hedger_timeout_includes_delay():
+    hedger = Hedger(min_samples=1)
+    hedger.observe(0.1)
+    release = threading.Event()
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        hedger.call(lambda: release.wait(1), timeout=0.15)
+    assert time.monotonic() - started < 0.22
+    assert hedger.hedged == 1
+    release.set()
+    hedger.close()
+
+
+def test_hedger_skips_duplicate_past_timeout():
+    hedger = Hedger(min_samples=1)
+    hedger.observe(0.5)
+    release = threading.Event()
+    with pytest.raises(DeadlineExceeded):
+        hedger.call(lambda: release.wait(1), timeout=0.05)
+    assert hedger.hedged == 0
+    release.set()
+    hedger.close()
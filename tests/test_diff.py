@@ -0,0 +1,80 @@
+from homework_bot.diff import Transition, diff_statuses
+from homework_bot.records import Homework, parse_homeworks
+from homework_bot.poller import TenantState
+from homework_bot.state import MemoryStateStore
+from homework_bot.tenants import Tenant
+
+
+def homework(id, status):
+    return Homework(str(id), f'hw{id}.zip', status, status)
+
+
+def raw_homework(id, status):
+    return {'id': id, 'homework_name': f'hw{id}.zip', 'status': status}
+
+
+def test_only_changed_homeworks_are_reported():
+    known = {'1': 'reviewing', '2': 'approved'}
+    homeworks = [
+        homework(1, 'rejected'), homework(2, 'approved'),
+        homework(3, 'reviewing'),
+    ]
+    assert diff_statuses(known, homeworks) == [
+        Transition('1', homeworks[0], 'reviewing', 'rejected'),
+        Transition('3', homeworks[2], None, 'reviewing'),
+    ]
+
+
+def test_first_occurrence_of_duplicate_wins():
+    homeworks = [homework(1, 'approved'), homework(1, 'reviewing')]
+    [transition] = diff_statuses({}, homeworks)
+    assert transition.new == 'approved'
+
+
+def test_batch_builds_records_only_for_transitions(monkeypatch):
+    batch = parse_homeworks(
+        [raw_homework(i, 'approved') for i in range(3)], {'approved': 'Ура!'}
+    )
+    built = []
+    monkeypatch.setattr(
+        type(batch), '__iter__', lambda self: built.append(self) or iter(())
+    )
+    [transition] = diff_statuses({'0': 'approved', '2': 'approved'}, batch)
+    assert transition == Transition(
+        '1', Homework('1', 'hw1.zip', 'approved', 'Ура!'), None, 'approved'
+    )
+    assert transition.homework.verdict == 'Ура!'
+    assert built == []
+
+
+def test_batch_with_duplicates_keeps_first_occurrence():
+    batch = parse_homeworks(
+        [raw_homework(1, 'approved'), raw_homework(1, 'reviewing')],
+        {'approved': 'Ура!', 'reviewing': 'На ревью.'},
+    )
+    [transition] = diff_statuses({}, batch)
+    assert transition.new == 'approved'
+
+
+def test_parse_status_called_only_for_transitions(
+        monkeypatch, homework_module
+):
+    homeworks = [raw_homework(i, 'approved') for i in range(1000)]
+    homeworks[10] = raw_homework(10, 'rejected')
+    parsed = []
+    monkeypatch.setattr(
+        homework_module, 'get_api_answer',
+        lambda from_date: {'homeworks': homeworks, 'current_date': 1}
+    )
+    monkeypatch.setattr(
+        homework_module, 'parse_status',
+        lambda hw: parsed.append(hw) or 'message'
+    )
+    monkeypatch.setattr(
+        homework_module, 'send_message', lambda bot, message: None
+    )
+    state = TenantState(Tenant('token', '1'))
+    state.statuses = {str(i): 'approved' for i in range(1000)}
+    homework_module.poll_tenant(None, MemoryStateStore(), None, state)
+    assert parsed == [Homework('10', 'hw10.zip', 'rejected', None)]
+    assert state.statuses['10'] == 'rejected'
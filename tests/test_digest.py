@@ -0,0 +1,138 @@
+import threading
+
+from homework_bot.digest import Digest, DigestBuffer, render_digest
+from homework_bot.poller import TenantState
+from homework_bot.state import MemoryStateStore
+from homework_bot.tenants import Tenant
+
+
+def test_render_digest_splits_by_limit():
+    assert render_digest(['a', 'b']) == ['a\nb']
+    assert render_digest(['aaa', 'bbb', 'c'], limit=5) == ['aaa', 'bbb\nc']
+    assert render_digest([]) == []
+
+
+def test_buffer_merges_within_window():
+    now = [0.0]
+    buffer = DigestBuffer(30, clock=lambda: now[0])
+    state = TenantState(Tenant('token', '1'))
+    buffer.add(state, {'1': 'hw1 reviewing'})
+    now[0] = 10.0
+    buffer.add(state, {'2': 'hw2 approved', '1': 'hw1 rejected'})
+    assert buffer.pop_due() == []
+    assert buffer.next_delay(600) == 20
+    now[0] = 30.0
+    assert buffer.pop_due() == [
+        Digest(state, ['hw1 rejected', 'hw2 approved'], [], None)
+    ]
+    assert buffer.next_delay(600) == 600
+
+
+def test_failed_digest_is_retried_and_merged():
+    now = [0.0]
+    buffer = DigestBuffer(30, clock=lambda: now[0])
+    state = TenantState(Tenant('token', '1'))
+    buffer.add(state, {'1': 'hw1 reviewing'})
+    assert buffer.hold(state, 100)
+    now[0] = 30.0
+    [digest] = buffer.pop_due()
+    buffer.add(state, {'2': 'hw2 approved'})
+    assert buffer.hold(state, 200)
+    buffer.retry(state)
+    now[0] = 60.0
+    [digest] = buffer.pop_due()
+    assert digest.messages == ['hw1 reviewing', 'hw2 approved']
+    assert digest.cursor == 200
+    buffer.done(state)
+    assert not buffer.hold(state, 300)
+
+
+def digest_poll(homework_module, monkeypatch, send_message, homeworks):
+    monkeypatch.setattr(
+        homework_module, 'get_api_answer',
+        lambda from_date: {'homeworks': homeworks, 'current_date': 50}
+    )
+    monkeypatch.setattr(homework_module, 'send_message', send_message)
+    now = [0.0]
+    digests = DigestBuffer(30, clock=lambda: now[0])
+    store = MemoryStateStore()
+    state = TenantState(Tenant('token', '1'))
+    state.cursor = 10
+    homework_module.poll_tenant(None, store, digests, state)
+    now[0] = 30.0
+    return digests, store, state
+
+
+def test_digest_statuses_are_saved_after_send(monkeypatch, homework_module):
+    sent = []
+    homeworks = [{'id': 1, 'homework_name': 'hw1', 'status': 'approved'}]
+    digests, store, state = digest_poll(
+        homework_module, monkeypatch,
+        lambda bot, message: sent.append(message), homeworks
+    )
+    assert state.statuses == {'1': 'approved'}
+    assert store.load_statuses() == {}
+    assert store.load_cursors() == {}
+    [digest] = digests.pop_due()
+    homework_module.digest_step(None, store, digests, digest)
+    assert len(sent) == 1
+    assert store.load_statuses() == {state.tenant.key: {'1': 'approved'}}
+    assert store.load_cursors() == {state.tenant.key: 50}
+
+
+def test_failed_digest_keeps_store(monkeypatch, homework_module):
+    def send_message(bot, message):
+        raise homework_module.exceptions.TelegramError('Ошибка Telegram')
+
+    homeworks = [{'id': 1, 'homework_name': 'hw1', 'status': 'approved'}]
+    digests, store, state = digest_poll(
+        homework_module, monkeypatch, send_message, homeworks
+    )
+    [digest] = digests.pop_due()
+    homework_module.digest_step(None, store, digests, digest)
+    assert store.load_statuses() == {}
+    assert store.load_cursors() == {}
+    assert digests.hold(state, 60)
+
+
+def test_digests_are_sent_by_stage_under_deadline(
+        monkeypatch, homework_module
+):
+    senders = []
+
+    def send_message(bot, message):
+        senders.append((
+            threading.current_thread().name,
+            homework_module.current_deadline() is not None,
+        ))
+
+    homeworks = [{'id': 1, 'homework_name': 'hw1', 'status': 'approved'}]
+    digests, store, state = digest_poll(
+        homework_module, monkeypatch, send_message, homeworks
+    )
+    stage = homework_module.start_digest_stage(None, store, digests)
+    homework_module.flush_digests(stage, digests)
+    stage.close()
+    [(thread, under_deadline)] = senders
+    assert thread.startswith('digest-') and under_deadline
+    assert store.load_statuses() == {state.tenant.key: {'1': 'approved'}}
+
+
+def test_poll_sends_one_message_for_all_changes(monkeypatch, homework_module):
+    homeworks = [
+        {'id': i, 'homework_name': f'hw{i}', 'status': 'approved'}
+        for i in range(3)
+    ]
+    sent = []
+    monkeypatch.setattr(
+        homework_module, 'get_api_answer',
+        lambda from_date: {'homeworks': homeworks, 'current_date': 1}
+    )
+    monkeypatch.setattr(
+        homework_module, 'send_message',
+        lambda bot, message: sent.append(message)
+    )
+    state = TenantState(Tenant('token', '1'))
+    homework_module.poll_tenant(None, MemoryStateStore(), None, state)
+    assert len(sent) == 1
+    assert sent[0].count('Изменился статус') == 3
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+import requests
+import telebot
+from telebot import apihelper
+
+from homework_bot.client import PracticumClient, build_session
+from homework_bot.fake_servers import (
+    PRACTICUM_PATH, Faults, FakePracticum, FakeTelegram, serve
+)
+from homework_bot.outbound import OutboundQueue
+
+
+@pytest.fixture
+def running():
+    servers = []
+
+    def start(fake):
+        server = servers.append(serve(fake)) or servers[-1]
+        host, port = server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_practicum_returns_changes_since_from_date(running):
+    fake = FakePracticum(homeworks=5)
+    url = running(fake) + PRACTICUM_PATH
+    client = PracticumClient(url, session=build_session(2, retries=0))
+    full = client.get('token', 0).json()
+    assert len(full['homeworks']) == 5
+    fake.set_status('token', 3, 'approved')
+    delta = client.get('token', full['current_date']).json()
+    assert [(hw['id'], hw['status']) for hw in delta['homeworks']] == [
+        (3, 'approved')
+    ]
+    client.close()
+
+
+def test_practicum_faults(running):
+    url = running(FakePracticum(faults=Faults(throttle_rate=1)))
+    response = requests.get(
+        url + PRACTICUM_PATH, headers={'Authorization': 'OAuth token'},
+        params={'from_date': 0}, timeout=1
+    )
+    assert response.status_code == 429
+    assert requests.get(url + PRACTICUM_PATH, timeout=1).status_code == 401
+
+
+def test_practicum_script(running):
+    fake = FakePracticum(homeworks=0, script=[
+        {'at': 0, 'token': 'token', 'id': 1, 'status': 'rejected'}
+    ])
+    url = running(fake) + PRACTICUM_PATH
+    answer = PracticumClient(url).get('token', 0).json()
+    assert [hw['status'] for hw in answer['homeworks']] == ['rejected']
+
+
+def test_telegram_flood_limit_with_real_telebot(running, monkeypatch):
+    fake = FakeTelegram(chat_rate=1)
+    monkeypatch.setattr(apihelper, 'API_URL', running(fake) + '/bot{0}/{1}')
+    bot = telebot.TeleBot('1234:abcdefg')
+    bot.send_message('42', 'first')
+    with pytest.raises(apihelper.ApiTelegramException) as error:
+        bot.send_message('42', 'second')
+    assert error.value.error_code == 429
+    assert fake.sent == [('42', 'first')]
+
+
+def test_outbound_queue_survives_flood_limit(running, monkeypatch):
+    fake = FakeTelegram(chat_rate=20, faults=Faults(retry_after=0))
+    monkeypatch.setattr(apihelper, 'API_URL', running(fake) + '/bot{0}/{1}')
+    queue = OutboundQueue(
+        telebot.TeleBot('1234:abcdefg'), global_rate=1000, chat_rate=100,
+        senders=1, max_attempts=100
+    ).start()
+    started = time.monotonic()
+    for number in range(5):
+        queue.send_message('42', str(number))
+    queue.close(timeout=5)
+    assert [text for _, text in fake.sent] == ['0', '1', '2', '3', '4']
+    assert queue.stats()['retried'] == fake.throttled
+    assert time.monotonic() - started < 2
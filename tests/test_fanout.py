@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from homework_bot.exceptions import TelegramError
+from homework_bot.fanout import FanOut
+from homework_bot.tenants import Tenant, current_tenant, tenant_context
+
+TENANT = Tenant('token', '1', {'subscribers': [2, '3', '1']})
+
+
+def test_chat_ids_start_with_student_and_skip_duplicates():
+    assert TENANT.chat_ids == ['1', '2', '3']
+    assert Tenant('token', '1').chat_ids == ['1']
+
+
+def test_fanout_sends_to_all_chats_at_once():
+    barrier = threading.Barrier(3, timeout=1)
+    seen = []
+
+    def send(chat_id):
+        seen.append(current_tenant())
+        barrier.wait()
+        if chat_id == '3':
+            raise ConnectionError('нет сети')
+
+    fanout = FanOut(workers=3)
+    with tenant_context(TENANT):
+        results = fanout.send(send, TENANT.chat_ids)
+    fanout.close()
+    assert results['1'] is None and results['2'] is None
+    assert isinstance(results['3'], ConnectionError)
+    assert seen == [TENANT] * 3
+    stats = fanout.stats()
+    assert (stats['1'].sent, stats['3'].failed) == (1, 1)
+    assert stats['3'].last_error == 'нет сети'
+    assert fanout.failing() == 1
+
+
+def test_subscriber_failure_does_not_fail_notification(homework_module, bot):
+    bot.failing = ('2',)
+    with tenant_context(TENANT):
+        homework_module.send_message(bot, 'статус')
+    assert sorted(bot.sent) == [('1', 'статус'), ('3', 'статус')]
+
+
+def test_student_chat_failure_raises(homework_module, bot):
+    bot.failing = ('1',)
+    with tenant_context(TENANT), pytest.raises(TelegramError):
+        homework_module.send_message(bot, 'статус')
+    assert sorted(bot.sent) == [('2', 'статус'), ('3', 'статус')]
+
+
+def test_single_tenant_subscribers_from_env(homework_module, monkeypatch):
+    monkeypatch.setattr(homework_module, 'TENANTS_FILE', None)
+    monkeypatch.setattr(homework_module, 'TELEGRAM_CHAT_ID', '1')
+    monkeypatch.setattr(homework_module, 'TELEGRAM_SUBSCRIBERS', '2, 3,')
+    [tenant] = homework_module.get_tenants()
+    assert tenant.chat_ids == ['1', '2', '3']
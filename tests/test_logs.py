@@ -0,0 +1,77 @@
+import io
+import json
+import logging
+
+import pytest
+
+from homework_bot.logs import (
+    JsonFormatter, build_handlers, start_queue_logging
+)
+from homework_bot.tenants import Tenant, tenant_context
+
+
+class Expensive:
+    def __init__(self):
+        self.rendered = 0
+
+    def __str__(self):
+        self.rendered += 1
+        return 'expensive'
+
+
+@pytest.fixture
+def logger():
+    return logging.Logger('tests.logs', logging.INFO)
+
+
+def attach(logger):
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    queue_handler, listener = start_queue_logging([output])
+    logger.addHandler(queue_handler)
+    return stream, listener
+
+
+def test_records_are_written_as_json_with_tenant(logger):
+    stream, listener = attach(logger)
+    with tenant_context(Tenant('token', '1', {'name': 'student'})):
+        logger.info('Статус %s', 'approved')
+        try:
+            raise ValueError('сбой')
+        except ValueError:
+            logger.exception('Ошибка')
+    logger.info('Без тенанта')
+    listener.stop()
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [entry['message'] for entry in entries] == [
+        'Статус approved', 'Ошибка', 'Без тенанта'
+    ]
+    assert [entry['tenant'] for entry in entries] == [
+        'student', 'student', '-'
+    ]
+    assert 'ValueError: сбой' in entries[1]['exception']
+
+
+def test_disabled_level_does_not_format_arguments(logger):
+    stream, listener = attach(logger)
+    argument = Expensive()
+    logger.debug('Ответ: %s', argument)
+    logger.info('Ответ: %s', argument)
+    listener.stop()
+    assert argument.rendered == 1
+    assert len(stream.getvalue().splitlines()) == 1
+
+
+def test_file_output_rotates(tmp_path, logger):
+    path = tmp_path / 'bot.log'
+    handlers = build_handlers(path=str(path), max_bytes=200, backups=2)
+    queue_handler, listener = start_queue_logging(handlers[1:])
+    logger.addHandler(queue_handler)
+    for number in range(50):
+        logger.info('Сообщение номер %s', number)
+    listener.stop()
+    handlers[1].close()
+    assert path.exists()
+    assert (tmp_path / 'bot.log.1').exists()
+    assert not (tmp_path / 'bot.log.3').exists()
@@ -0,0 +1,65 @@
+import urllib.request
+
+import pytest
+
+from homework_bot.metrics import Registry, start_http_server
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_by_label(registry):
+    counter = registry.counter('errors_total', 'Ошибки.', ('type',))
+    counter.inc('TypeError')
+    counter.inc('TypeError')
+    counter.inc('KeyError', amount=3)
+    assert counter.value('TypeError') == 2
+    assert registry.render() == (
+        '# HELP errors_total Ошибки.\n'
+        '# TYPE errors_total counter\n'
+        'errors_total{type="KeyError"} 3\n'
+        'errors_total{type="TypeError"} 2\n'
+    )
+    with pytest.raises(ValueError):
+        counter.inc()
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = registry.histogram('latency_seconds', 'Задержка.',
+                                   buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum 6.05' in lines
+    assert 'latency_seconds_count 4' in lines
+
+
+def test_gauge_function_and_label_escaping(registry):
+    registry.gauge('depth', 'Глубина.', function=lambda: 7)
+    registry.counter('odd', 'Метки.', ('name',)).inc('a"b\\c')
+    text = registry.render()
+    assert 'depth 7\n' in text
+    assert 'odd{name="a\\"b\\\\c"} 1\n' in text
+
+
+def test_registry_returns_existing_metric(registry):
+    first = registry.counter('hits_total', 'Хиты.')
+    assert registry.counter('hits_total', 'Хиты.') is first
+
+
+def test_metrics_endpoint(registry):
+    registry.counter('hits_total', 'Хиты.').inc()
+    server = start_http_server(0, registry, host='127.0.0.1')
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        with urllib.request.urlopen(url, timeout=1) as response:
+            body = response.read().decode()
+        assert 'hits_total 1' in body
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,145 @@
+import time
+
+import pytest
+
+from homework_bot.metrics import Counter, Histogram
+from homework_bot.outbound import OutboundQueue, TokenBucket
+from homework_bot.poller import TenantState
+from homework_bot.state import MemoryStateStore
+from homework_bot.tenants import Tenant
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2, capacity=2, now=0)
+    bucket.take(0)
+    bucket.take(0)
+    assert bucket.delay(0) == 0.5
+    assert bucket.delay(0.5) == 0
+    bucket.block(10)
+    assert bucket.delay(1) == 9
+
+
+def test_queue_delivers_every_message(bot):
+    queue = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    for number in range(50):
+        queue.send_message(str(number % 5), f'message {number}')
+    queue.close(timeout=5)
+    assert len(bot.sent) == 50
+    stats = queue.stats()
+    assert stats['sent'] == 50
+    assert stats['depth'] == 0
+
+
+def test_queue_limits_chat_rate(bot):
+    queue = OutboundQueue(
+        bot, global_rate=1000, chat_rate=20, senders=1
+    ).start()
+    for number in range(25):
+        queue.send_message('1', str(number))
+    queue.close(timeout=5)
+    assert [text for _, text in bot.sent] == [str(n) for n in range(25)]
+    assert queue.stats()['wait_max'] >= 0.2
+
+
+def test_queue_honors_retry_after(bot):
+    bot.floods = 1
+    queue = OutboundQueue(bot, chat_rate=1000, senders=1).start()
+    queue.send_message('1', 'text')
+    queue.close(timeout=5)
+    assert bot.sent == [('1', 'text')]
+    assert queue.stats()['retried'] == 1
+
+
+def test_retried_message_keeps_chat_order(bot):
+    bot.floods = 1
+    queue = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    for number in range(5):
+        queue.send_message('1', str(number))
+    queue.close(timeout=5)
+    assert [text for _, text in bot.sent] == [str(n) for n in range(5)]
+
+
+class FailingBot:
+    def send_message(self, chat_id, text):
+        raise ConnectionError('нет сети')
+
+
+def test_future_completes_after_delivery(bot):
+    queue = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    future = queue.send_message('1', 'text')
+    assert future.result(timeout=1) is None
+    assert bot.sent == [('1', 'text')]
+    queue.close(timeout=5)
+    failing = OutboundQueue(FailingBot()).start()
+    failed = failing.send_message('1', 'text')
+    assert isinstance(failed.exception(timeout=1), ConnectionError)
+    failing.close(timeout=5)
+
+
+def test_queue_measures_each_send_call(bot):
+    latency = Histogram('send_seconds', 'Отправка.')
+    deliveries = Counter('deliveries_total', 'Отправки.', ('result',))
+    bot.floods = 1
+    queue = OutboundQueue(
+        bot, global_rate=1000, chat_rate=1000,
+        latency=latency, deliveries=deliveries
+    ).start()
+    queue.send_message('1', 'first')
+    queue.send_message('2', 'second')
+    queue.close(timeout=5)
+    failing = OutboundQueue(FailingBot(), deliveries=deliveries).start()
+    failing.send_message('1', 'text')
+    failing.close(timeout=5)
+    assert 'send_seconds_count 3' in latency.render()
+    assert deliveries.value('sent') == 2
+    assert deliveries.value('failed') == 1
+
+
+def test_cancelled_message_is_not_sent(bot):
+    queue = OutboundQueue(bot, global_rate=1000, chat_rate=1000)
+    first = queue.send_message('1', 'first')
+    second = queue.send_message('1', 'second')
+    assert first.cancel()
+    queue.start().close(timeout=5)
+    assert bot.sent == [('1', 'second')]
+    assert second.done() and queue.stats()['depth'] == 0
+
+
+def test_message_waiting_for_token_can_be_cancelled(bot):
+    queue = OutboundQueue(bot, global_rate=1000, chat_rate=2).start()
+    sent = [queue.send_message('1', text) for text in ('first', 'second')]
+    waiting = queue.send_message('1', 'third')
+    for future in sent:
+        future.result(timeout=1)
+    assert waiting.cancel()
+    queue.close(timeout=5)
+    assert bot.sent == [('1', 'first'), ('1', 'second')]
+    assert queue.stats()['depth'] == 0
+
+
+def test_message_waiting_for_retry_can_be_cancelled(bot):
+    bot.floods = 1
+    bot.retry_after = 0.3
+    queue = OutboundQueue(bot, global_rate=1000, chat_rate=1000).start()
+    future = queue.send_message('1', 'text')
+    deadline = time.monotonic() + 1
+    while not queue.stats()['retried']:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    assert future.cancel()
+    queue.close(timeout=5)
+    assert bot.sent == []
+
+
+def test_undelivered_queued_message_keeps_statuses(homework_module):
+    queue = OutboundQueue(FailingBot()).start()
+    state = TenantState(Tenant('token', '1'))
+    store = MemoryStateStore()
+    homeworks = homework_module.check_response({'homeworks': [
+        {'id': 7, 'homework_name': 'hw.zip', 'status': 'approved'}
+    ]})
+    with pytest.raises(homework_module.exceptions.TelegramError):
+        homework_module.notify_changes(queue, store, None, state, homeworks)
+    queue.close(timeout=5)
+    assert state.statuses == {}
+    assert store.load_statuses() == {}
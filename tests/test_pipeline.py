@@ -0,0 +1,198 @@
+import logging
+import os
+import queue
+import signal
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from homework_bot.deadline import current_deadline
+from homework_bot.pipeline import Stage
+from homework_bot.poller import MultiTenantPoller, TenantState
+from homework_bot.scheduler import AdaptiveSchedule
+from homework_bot.state import MemoryStateStore, SQLiteStateStore
+from homework_bot.tenants import Tenant
+
+
+def test_full_stage_blocks_producer():
+    release = threading.Event()
+    stage = Stage('slow', lambda item: release.wait(1), maxsize=1).start()
+    stage.put(1)
+    stage.put(2)
+    with pytest.raises(queue.Full):
+        stage.put(3, timeout=0.05)
+    assert stage.depth() == 1
+    release.set()
+    stage.close()
+    assert stage.depth() == 0
+
+
+def test_stage_survives_handler_errors(caplog):
+    handled = []
+
+    def handler(item):
+        if item == 'bad':
+            raise ValueError('сбой')
+        handled.append(item)
+
+    stage = Stage('work', handler, workers=2).start()
+    with caplog.at_level(logging.ERROR):
+        for item in ('a', 'bad', 'b'):
+            stage.put(item)
+        stage.close()
+    assert sorted(handled) == ['a', 'b']
+    assert 'Сбой на этапе work: сбой' in caplog.text
+
+
+def run_pipeline(homework_module, bot, state, store):
+    stages = homework_module.start_pipeline(bot, store, None)
+    done = homework_module.fetch_step(bot, stages[0], state)
+    for stage in stages:
+        stage.join()
+    for stage in stages:
+        stage.close()
+    return done
+
+
+def test_pipeline_sends_and_records(monkeypatch, homework_module):
+    sent = []
+    homework = {'id': 7, 'homework_name': 'hw.zip', 'status': 'approved'}
+    monkeypatch.setattr(
+        homework_module, 'get_api_answer',
+        lambda from_date: {'homeworks': [homework], 'current_date': 50}
+    )
+    monkeypatch.setattr(
+        homework_module, 'send_message',
+        lambda bot, message: sent.append(message)
+    )
+    store = MemoryStateStore()
+    state = TenantState(Tenant('token', '1'))
+    state.cursor = 10
+    run_pipeline(homework_module, None, state, store)
+    assert len(sent) == 1
+    assert state.statuses == {'7': 'approved'}
+    assert store.load_cursors() == {state.tenant.key: 50}
+    assert not state.in_flight
+
+
+def test_completed_job_is_written_to_disk(
+        monkeypatch, homework_module, tmp_path
+):
+    homework = {'id': 7, 'homework_name': 'hw.zip', 'status': 'approved'}
+    monkeypatch.setattr(
+        homework_module, 'get_api_answer',
+        lambda from_date: {'homeworks': [homework], 'current_date': 50}
+    )
+    monkeypatch.setattr(
+        homework_module, 'send_message', lambda bot, message: None
+    )
+    path = str(tmp_path / 'state.db')
+    store = SQLiteStateStore(path)
+    state = TenantState(Tenant('token', '1'))
+    state.cursor = 10
+    run_pipeline(homework_module, None, state, store)
+    reader = SQLiteStateStore(path)
+    assert reader.load_statuses() == {state.tenant.key: {'7': 'approved'}}
+    assert reader.load_cursors() == {state.tenant.key: 50}
+    reader.close()
+    store.close()
+
+
+def test_sigterm_raises_system_exit(homework_module):
+    previous = signal.getsignal(signal.SIGTERM)
+    try:
+        homework_module.exit_on_sigterm()
+        with pytest.raises(SystemExit):
+            os.kill(os.getpid(), signal.SIGTERM)
+            time.sleep(1)
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def test_failed_send_keeps_cursor(monkeypatch, homework_module):
+    homework = {'id': 7, 'homework_name': 'hw.zip', 'status': 'approved'}
+    monkeypatch.setattr(
+        homework_module, 'get_api_answer',
+        lambda from_date: {'homeworks': [homework], 'current_date': 50}
+    )
+
+    def send_message(bot, message):
+        raise homework_module.exceptions.TelegramError('Ошибка Telegram')
+
+    monkeypatch.setattr(homework_module, 'send_message', send_message)
+    store = MemoryStateStore()
+    state = TenantState(Tenant('token', '1'))
+    state.cursor = 10
+    done = run_pipeline(homework_module, None, state, store)
+    assert state.cursor == 10
+    assert state.statuses == {}
+    assert isinstance(
+        done.exception(), homework_module.exceptions.TelegramError
+    )
+    assert not state.in_flight
+
+
+def test_tenant_in_flight_is_not_fetched_again(homework_module):
+    stage = Stage('diff', lambda item: None)
+    state = TenantState(Tenant('token', '1'))
+    state.in_flight = True
+    homework_module.fetch_step(None, stage, state)
+    assert stage.depth() == 0
+
+
+def failing_pipeline(homework_module, monkeypatch):
+    homework = {'id': 7, 'homework_name': 'hw.zip', 'status': 'approved'}
+    deadlines = []
+
+    def get_api_answer(from_date):
+        deadlines.append(current_deadline())
+        return {'homeworks': [homework], 'current_date': 50}
+
+    def send_message(bot, message):
+        deadlines.append(current_deadline())
+        raise homework_module.exceptions.TelegramError('Ошибка Telegram')
+
+    monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+    monkeypatch.setattr(homework_module, 'send_message', send_message)
+    return deadlines
+
+
+def test_pipeline_failures_back_off_tenant(monkeypatch, homework_module):
+    deadlines = failing_pipeline(homework_module, monkeypatch)
+    now = [0.0]
+    stages = homework_module.start_pipeline(None, MemoryStateStore(), None)
+    poller = MultiTenantPoller(
+        partial(homework_module.fetch_step, None, stages[0]),
+        [Tenant('token', '1')], 1,
+        schedule=AdaptiveSchedule(600, 60, 3600), clock=lambda: now[0]
+    )
+    [state] = poller.states
+    for _ in range(2):
+        now[0] = max(state.next_poll_at, 0)
+        assert poller.run_cycle() == 1
+        for stage in stages:
+            stage.join()
+    for stage in stages:
+        stage.close()
+    assert state.errors == 2
+    assert state.idle_polls == 0
+    assert 600 <= state.next_poll_at - now[0] <= 1200
+    assert deadlines[0] is deadlines[1] is not None
+    assert deadlines[2] is deadlines[3] is not deadlines[0]
+
+
+def test_skipped_tenant_is_not_an_idle_poll(homework_module):
+    stage = Stage('diff', lambda item: None)
+    poller = MultiTenantPoller(
+        partial(homework_module.fetch_step, None, stage),
+        [Tenant('token', '1')], 1,
+        schedule=AdaptiveSchedule(600, 60, 3600), clock=lambda: 0.0
+    )
+    [state] = poller.states
+    state.in_flight = True
+    state.errors = 1
+    assert poller.run_cycle() == 0
+    assert (state.errors, state.idle_polls) == (1, 0)
+    assert state.next_poll_at >= 600
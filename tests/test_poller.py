@@ -0,0 +1,61 @@
+import json
+import threading
+
+import pytest
+
+from homework_bot.poller import MultiTenantPoller
+from homework_bot.tenants import Tenant, current_tenant, load_tenants
+
+
+def make_tenants(count):
+    return [Tenant(f'token{i}', str(i)) for i in range(count)]
+
+
+@pytest.mark.parametrize('workers', [1, 8])
+def test_every_tenant_polled_in_own_context(workers):
+    seen = []
+    lock = threading.Lock()
+
+    def step(state):
+        with lock:
+            seen.append((state.tenant, current_tenant()))
+
+    tenants = make_tenants(20)
+    poller = MultiTenantPoller(step, tenants, max_workers=workers)
+    try:
+        assert poller.run_cycle() == 20
+    finally:
+        poller.close()
+    assert sorted(tenant.chat_id for tenant, _ in seen) == sorted(
+        tenant.chat_id for tenant in tenants
+    )
+    assert all(tenant is context for tenant, context in seen)
+    assert current_tenant() is None
+
+
+def test_tenant_failure_is_isolated():
+    def step(state):
+        if state.tenant.chat_id == '1':
+            raise RuntimeError('boom')
+        state.prev_message = 'ok'
+
+    poller = MultiTenantPoller(step, make_tenants(3), max_workers=3)
+    try:
+        assert poller.run_cycle() == 2
+    finally:
+        poller.close()
+    failed, *others = sorted(
+        poller.states, key=lambda state: state.tenant.chat_id != '1'
+    )
+    assert failed.errors == 1
+    assert all(state.prev_message == 'ok' for state in others)
+
+
+def test_load_tenants(tmp_path):
+    path = tmp_path / 'tenants.json'
+    path.write_text(json.dumps([
+        {'token': 'abc', 'chat_id': 42, 'name': 'student'}
+    ]))
+    [tenant] = load_tenants(path)
+    assert tenant == Tenant('abc', '42')
+    assert tenant.name == 'student'
@@ -0,0 +1,64 @@
+import os
+import pstats
+import signal
+import time
+
+import pytest
+
+from homework_bot.profiling import StageProfiler
+
+
+def work():
+    return sum(number * number for number in range(1000))
+
+
+def wait_enabled(profiler, enabled):
+    deadline = time.monotonic() + 1
+    while profiler.enabled != enabled:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_disabled_stage_is_shared_null_context(tmp_path):
+    profiler = StageProfiler(str(tmp_path))
+    assert profiler.stage('fetch') is profiler.stage('send')
+    with profiler.stage('fetch'):
+        work()
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'), reason='нет SIGUSR1')
+def test_signal_toggles_profiling_and_dumps_stages(tmp_path):
+    profiler = StageProfiler(str(tmp_path))
+    previous = signal.getsignal(signal.SIGUSR1)
+    profiler.install()
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        wait_enabled(profiler, True)
+        with profiler.stage('fetch'):
+            work()
+        with profiler.stage('parse'):
+            work()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        wait_enabled(profiler, False)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+    files = sorted(os.listdir(tmp_path))
+    assert [name.split('-')[0] for name in files] == ['fetch', 'parse']
+    stats = pstats.Stats(str(tmp_path / files[0]))
+    assert any(func[2] == 'work' for func in stats.stats)
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'), reason='нет SIGUSR1')
+def test_signal_handler_does_not_take_profiler_lock(tmp_path):
+    profiler = StageProfiler(str(tmp_path))
+    previous = signal.getsignal(signal.SIGUSR1)
+    profiler.install()
+    try:
+        with profiler._lock:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert not profiler.enabled
+        wait_enabled(profiler, True)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+        profiler.stop()
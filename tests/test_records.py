@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+
+from homework_bot.records import Homework, parse_homeworks
+
+VERDICTS = {'approved': 'Ура!', 'rejected': 'Есть замечания.'}
+
+
+def test_single_pass_collects_every_error():
+    items = [
+        {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'},
+        {'id': 2, 'status': 'unknown'},
+        'not a dict',
+        {'homework_name': 'hw3.zip', 'status': ['approved']},
+        {'homework_name': 'hw4.zip', 'status': 'rejected'},
+    ]
+    batch = parse_homeworks(items, VERDICTS)
+    assert list(batch) == [
+        Homework('1', 'hw1.zip', 'approved', 'Ура!'),
+        Homework('hw4.zip', 'hw4.zip', 'rejected', 'Есть замечания.'),
+    ]
+    assert batch[1].verdict == 'Есть замечания.'
+    assert [(index, type(error)) for index, error in batch.errors] == [
+        (1, KeyError), (1, ValueError), (2, TypeError), (3, ValueError),
+    ]
+
+
+def test_record_has_no_instance_dict():
+    record = Homework('1', 'hw1.zip', 'approved', 'Ура!')
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_from_dict_raises_first_error():
+    with pytest.raises(KeyError):
+        Homework.from_dict({'status': 'unknown'}, VERDICTS)
+
+
+def test_invalid_homeworks_are_skipped_and_counted(caplog, homework_module):
+    response = {
+        'homeworks': [
+            {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'},
+            {'id': 2, 'homework_name': 'hw2.zip', 'status': 'unknown'},
+        ],
+        'current_date': 1,
+    }
+    counter = homework_module.VALIDATION_ERRORS
+    before = counter.value('ValueError')
+    with caplog.at_level(logging.ERROR):
+        homeworks = homework_module.validate(response)
+    assert [homework.key for homework in homeworks] == ['1']
+    assert counter.value('ValueError') == before + 1
+    assert '#1: Неизвестный статус работы: unknown.' in caplog.text
+    assert homework_module.parse_status(homeworks[0]) == (
+        'Изменился статус проверки работы "hw1.zip". '
+        'Работа проверена: ревьюеру всё понравилось. Ура!'
+    )
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from homework_bot.poller import MultiTenantPoller, TenantState
+from homework_bot.scheduler import AdaptiveSchedule
+from homework_bot.tenants import Tenant
+
+
+def make_state(statuses=None, errors=0, idle_polls=0):
+    state = TenantState(Tenant('token', '1'))
+    state.statuses = statuses or {}
+    state.errors = errors
+    state.idle_polls = idle_polls
+    return state
+
+
+@pytest.fixture
+def schedule():
+    return AdaptiveSchedule(600, 60, 3600, rng=random.Random(0))
+
+
+def test_reviewing_polls_fast(schedule):
+    state = make_state({'1': 'approved', '2': 'reviewing'}, idle_polls=5)
+    assert schedule.next_delay(state) == 60
+
+
+def test_idle_backs_off_up_to_max(schedule):
+    delays = [
+        schedule.next_delay(make_state(idle_polls=polls))
+        for polls in range(1, 8)
+    ]
+    assert delays[0] == 600
+    assert delays == sorted(delays)
+    assert delays[-1] == 3600
+
+
+def test_errors_back_off_with_jitter(schedule):
+    assert schedule.next_delay(make_state(errors=1)) == 600
+    delays = [schedule.next_delay(make_state(errors=4)) for _ in range(50)]
+    assert all(600 <= delay <= 3600 for delay in delays)
+    assert len(set(delays)) > 1
+    assert schedule.next_delay(make_state(errors=10 ** 6)) <= 3600
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveSchedule(600, 700, 3600)
+
+
+def test_poller_skips_tenants_that_are_not_due(schedule):
+    now = [0.0]
+    polled = []
+
+    def step(state):
+        polled.append(state.tenant.chat_id)
+        if state.tenant.chat_id == 'active':
+            state.statuses = {'1': 'reviewing'}
+
+    poller = MultiTenantPoller(
+        step, [Tenant('a', 'active'), Tenant('b', 'idle')], 1,
+        schedule=schedule, clock=lambda: now[0]
+    )
+    poller.run_cycle()
+    assert poller.next_delay(600) == 60
+    now[0] = 60.0
+    poller.run_cycle()
+    assert polled == ['active', 'idle', 'active']
@@ -0,0 +1,101 @@
+import os
+import time
+
+import pytest
+
+from homework_bot.metrics import Registry, start_http_server
+from homework_bot.sharding import (
+    HashRing, ShardedRegistry, Supervisor, shard_tenants
+)
+from homework_bot.tenants import Tenant
+
+
+def crash(shard, shards):
+    os._exit(3)
+
+
+def wait_for_stop(shard, shards):
+    marker = os.environ['SHARDING_TEST_MARKER']
+    open(marker, 'w').close()
+    try:
+        time.sleep(10)
+    finally:
+        with open(marker, 'w') as file:
+            file.write('stopped')
+
+
+def test_ring_assigns_every_key_to_one_shard():
+    tenants = [Tenant(f'token-{i}', str(i)) for i in range(300)]
+    shards = [shard_tenants(tenants, shard, 3) for shard in range(3)]
+    assert sorted(sum(shards, []), key=lambda t: t.chat_id) == sorted(
+        tenants, key=lambda t: t.chat_id
+    )
+    assert all(len(part) > 50 for part in shards)
+
+
+def test_ring_moves_few_keys_when_growing():
+    keys = [f'tenant-{i}' for i in range(1000)]
+    before, after = HashRing(4), HashRing(5)
+    moved = sum(before.shard_for(key) != after.shard_for(key) for key in keys)
+    assert moved < 350
+    with pytest.raises(ValueError):
+        HashRing(0)
+
+
+def test_supervisor_restarts_crashed_worker_with_backoff(clock):
+    supervisor = Supervisor(crash, 1, restart_delay=1, clock=clock).start()
+    supervisor.processes[0].join(1)
+    assert supervisor.check() == 0
+    clock.now = 1
+    assert supervisor.check() == 1
+    supervisor.processes[0].join(1)
+    clock.now = 2
+    assert supervisor.check() == 0
+    clock.now = 3
+    assert supervisor.check() == 0
+    clock.now = 4
+    assert supervisor.check() == 1
+    assert supervisor.restarts == [2]
+    supervisor.stop(1)
+    assert not supervisor.processes[0].is_alive()
+
+
+def test_sharded_registry_labels_samples_by_shard():
+    servers = []
+    for value in (2, 5):
+        registry = Registry()
+        registry.counter('sent_total', 'Отправлено.', ('chat',)).inc(
+            'a', amount=value
+        )
+        registry.histogram('latency_seconds', 'Задержка.', buckets=(1,))
+        registry.histogram('latency_seconds', 'Задержка.').observe(0.5)
+        servers.append(start_http_server(0, registry, '127.0.0.1'))
+    urls = [
+        f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        for server in servers
+    ] + ['http://127.0.0.1:9/metrics']
+    try:
+        lines = ShardedRegistry(urls, timeout=0.5).render().splitlines()
+    finally:
+        for server in servers:
+            server.shutdown()
+    assert lines.count('# TYPE sent_total counter') == 1
+    assert 'sent_total{shard="0",chat="a"} 2' in lines
+    assert 'sent_total{shard="1",chat="a"} 5' in lines
+    assert 'latency_seconds_count{shard="1"} 1' in lines
+    assert 'worker_up{shard="2"} 0' in lines
+    type_line = lines.index('# TYPE latency_seconds histogram')
+    assert lines[type_line + 1].startswith('latency_seconds_bucket')
+
+
+def test_stopped_worker_runs_its_finally(tmp_path, monkeypatch):
+    marker = tmp_path / 'marker'
+    monkeypatch.setenv('SHARDING_TEST_MARKER', str(marker))
+    supervisor = Supervisor(wait_for_stop, 1).start()
+    deadline = time.monotonic() + 1.5
+    while not marker.exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    supervisor.stop(timeout=1)
+    assert marker.read_text() == 'stopped'
+    assert supervisor.processes[0].exitcode != 0
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from homework_bot.exceptions import DeadlineExceeded
+from homework_bot.singleflight import SingleFlight
+from homework_bot.tenants import Tenant, tenant_context
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 1
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def run_concurrently(flight, key, func, callers):
+    results = [None] * callers
+
+    def call(number):
+        try:
+            results[number] = flight.do(key, func)
+        except Exception as error:
+            results[number] = error
+
+    threads = [
+        threading.Thread(target=call, args=(number,))
+        for number in range(callers)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_identical_calls_share_one():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        release.wait(1)
+        return {'homeworks': []}
+
+    threads, results = run_concurrently(flight, ('token', 0), func, 5)
+    wait_for(lambda: flight.stats()['shared'] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_error_is_shared_and_not_cached():
+    flight = SingleFlight(ttl=60)
+    release = threading.Event()
+
+    def func():
+        release.wait(1)
+        raise ConnectionError('нет ответа')
+
+    threads, results = run_concurrently(flight, 'key', func, 3)
+    wait_for(lambda: flight.stats()['shared'] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert flight.do('key', lambda: 'ok') == 'ok'
+
+
+def test_result_is_cached_for_ttl(clock):
+    flight = SingleFlight(ttl=5, clock=clock)
+    assert flight.do('key', lambda: 1) == 1
+    clock.now = 4
+    assert flight.do('key', lambda: 2) == 1
+    assert flight.do('other', lambda: 3) == 3
+    clock.now = 5
+    assert flight.do('key', lambda: 4) == 4
+    assert flight.stats() == {'calls': 3, 'shared': 0, 'cached': 1}
+
+
+def test_cache_is_bounded(clock):
+    flight = SingleFlight(ttl=5, max_entries=2, clock=clock)
+    for key in range(3):
+        flight.do(key, lambda: key)
+    assert flight.do(0, lambda: 'fresh') == 'fresh'
+    assert flight.do(2, lambda: 'fresh') == 2
+
+
+def test_waiting_for_shared_call_respects_timeout():
+    flight = SingleFlight()
+    release = threading.Event()
+    threads, _ = run_concurrently(
+        flight, 'key', lambda: release.wait(1), 1
+    )
+    wait_for(lambda: flight.stats()['calls'] == 1)
+    with pytest.raises(DeadlineExceeded):
+        flight.do('key', lambda: None, timeout=0.01)
+    release.set()
+    threads[0].join()
+
+
+def test_tenants_with_one_token_share_api_answer(homework_module, monkeypatch):
+    requested = []
+
+    def request_api_answer(client, token, local_time, key=None, shared=False):
+        requested.append((token, local_time))
+        return {'homeworks': [], 'current_date': local_time}
+
+    monkeypatch.setattr(homework_module, 'PRACTICUM_SINGLE_FLIGHT', '1')
+    monkeypatch.setattr(homework_module, 'single_flight', SingleFlight(60))
+    monkeypatch.setattr(homework_module, 'shared_tokens', {'shared'})
+    monkeypatch.setattr(
+        homework_module, 'request_api_answer', request_api_answer
+    )
+    for chat_id in ('1', '2'):
+        with tenant_context(Tenant('shared', chat_id)):
+            answer = homework_module.get_api_answer(10)
+    with tenant_context(Tenant('other', '3')):
+        homework_module.get_api_answer(10)
+    assert answer == {'homeworks': [], 'current_date': 10}
+    assert requested == [('shared', 10), ('other', 10)]
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+from homework_bot.startup import startup_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_defers_heavy_dependencies():
+    code = (
+        'import sys, homework; '
+        'print(sorted({"telebot", "requests", "http.server", "sqlite3"} '
+        '& set(sys.modules)))'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+        text=True, check=True
+    ).stdout
+    assert output.strip() == '[]'
+
+
+def test_startup_report_lists_import_times():
+    report = startup_report('homework', ROOT, deferred=('json',), top=3)
+    lines = report.splitlines()
+    assert lines[0].startswith('Импорт homework: ')
+    assert lines[1].startswith('  отложенный импорт json: ')
+    assert len(lines) == 6
@@ -0,0 +1,112 @@
+import sqlite3
+from functools import partial
+
+import pytest
+
+from homework_bot.poller import MultiTenantPoller, TenantState
+from homework_bot.state import MemoryStateStore, SQLiteStateStore
+from homework_bot.tenants import Tenant, tenant_context
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        store = MemoryStateStore()
+    else:
+        store = SQLiteStateStore(str(tmp_path / 'state.db'))
+    yield store
+    store.close()
+
+
+def test_cursor_roundtrip(store):
+    store.set_cursor('a', 100)
+    store.set_cursor('b', 200)
+    store.set_cursor('a', 150)
+    assert store.load_cursors() == {'a': 150, 'b': 200}
+
+
+def test_statuses_roundtrip(store):
+    store.set_statuses('a', {'1': 'reviewing', '2': 'approved'})
+    store.set_statuses('a', {'1': 'rejected'})
+    store.set_statuses('b', {'1': 'approved'})
+    assert store.load_statuses() == {
+        'a': {'1': 'rejected', '2': 'approved'},
+        'b': {'1': 'approved'},
+    }
+
+
+def test_sqlite_batches_writes_in_wal_mode(tmp_path):
+    path = str(tmp_path / 'state.db')
+    store = SQLiteStateStore(path, batch_size=3)
+    reader = sqlite3.connect(path)
+    assert reader.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+
+    def written():
+        return reader.execute('SELECT COUNT(*) FROM statuses').fetchone()[0]
+
+    store.set_statuses('a', {'1': 'reviewing', '2': 'reviewing'})
+    assert written() == 0
+    store.set_statuses('a', {'3': 'reviewing'})
+    assert written() == 3
+    store.set_statuses('a', {'4': 'reviewing'})
+    store.flush()
+    assert written() == 4
+    reader.close()
+    store.close()
+
+
+def test_sqlite_cursor_survives_restart(tmp_path):
+    path = str(tmp_path / 'state.db')
+    store = SQLiteStateStore(path)
+    store.set_cursor('a', 100)
+    store.close()
+    store = SQLiteStateStore(path)
+    assert store.load_cursors() == {'a': 100}
+    store.close()
+
+
+def test_known_status_is_not_resent_after_restart(
+        monkeypatch, homework_module
+):
+    sent = []
+    homework = {'id': 7, 'homework_name': 'hw.zip', 'status': 'approved'}
+    monkeypatch.setattr(
+        homework_module, 'get_api_answer',
+        lambda from_date: {'homeworks': [homework], 'current_date': 1}
+    )
+    monkeypatch.setattr(
+        homework_module, 'send_message',
+        lambda bot, message: sent.append(message)
+    )
+    store = MemoryStateStore()
+    tenant = Tenant('token', '1')
+    for _ in range(2):
+        poller = MultiTenantPoller(
+            partial(homework_module.poll_tenant, None, store, None),
+            [tenant], 1
+        )
+        poller.restore(store)
+        poller.run_cycle()
+    assert len(sent) == 1
+
+
+def test_poll_advances_cursor_from_current_date(monkeypatch, homework_module):
+    requested = []
+
+    def get_api_answer(from_date):
+        requested.append(from_date)
+        return {'homeworks': [], 'current_date': from_date + 60}
+
+    monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+    monkeypatch.setattr(
+        homework_module, 'send_message', lambda bot, message: None
+    )
+    store = MemoryStateStore()
+    tenant = Tenant('token', '1')
+    state = TenantState(tenant)
+    state.cursor = 1000
+    with tenant_context(tenant):
+        homework_module.poll_tenant(None, store, None, state)
+        homework_module.poll_tenant(None, store, None, state)
+    assert requested == [1000, 1060]
+    assert store.load_cursors() == {tenant.key: 1120}
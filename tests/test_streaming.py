@@ -0,0 +1,150 @@
+import json
+import tracemalloc
+
+import pytest
+
+from homework_bot.client import PracticumClient
+from homework_bot.diff import diff_statuses
+from homework_bot.exceptions import EmptyResponseError
+from homework_bot.streaming import JsonReader, StreamingAnswer
+
+
+class StreamedResponse:
+    def __init__(self, body, headers=None, chunk=1):
+        self.body = body
+        self.headers = headers or {}
+        self.chunk = chunk
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), self.chunk):
+            yield self.body[start:start + self.chunk]
+
+    def close(self):
+        self.closed = True
+
+
+class GeneratedResponse:
+    headers = {}
+
+    def __init__(self, size):
+        self.size = size
+
+    def iter_content(self, chunk_size):
+        yield b'{"homeworks": ['
+        for number in range(self.size):
+            yield (b',' if number else b'') + json.dumps({
+                'id': number, 'homework_name': f'hw{number}.zip',
+                'status': 'approved', 'reviewer_comment': 'x' * 100,
+            }).encode()
+        yield b'], "current_date": 42}'
+
+    def close(self):
+        pass
+
+
+def streamed(data, **kwargs):
+    return StreamingAnswer(StreamedResponse(
+        json.dumps(data, ensure_ascii=False).encode(), **kwargs
+    ))
+
+
+def test_values_split_across_chunks():
+    values = [12345, 'домашка', {'a': [1, 2.5, None]}, True, 'x' * 50]
+    body = json.dumps(values, ensure_ascii=False).encode()
+    reader = JsonReader(StreamedResponse(body).iter_content(1))
+    assert list(reader.items()) == values
+    assert reader.peek() == ''
+
+
+def test_answer_yields_homeworks_and_keeps_other_fields():
+    homeworks = [{'id': 1, 'status': 'approved'}, {'id': 2}]
+    answer = streamed({'current_date': 1, 'homeworks': homeworks, 'x': 2})
+    assert answer == {}
+    assert list(answer.homeworks()) == homeworks
+    assert answer == {'current_date': 1, 'x': 2}
+    assert answer.response.closed
+
+
+@pytest.mark.parametrize('data, error', [
+    ([], TypeError),
+    ({'homeworks': {}}, TypeError),
+    ({'current_date': 1}, EmptyResponseError),
+    ({}, EmptyResponseError),
+])
+def test_invalid_answer_raises(data, error):
+    answer = streamed(data)
+    with pytest.raises(error):
+        list(answer.homeworks())
+    assert answer.response.closed
+
+
+def test_truncated_body_raises():
+    answer = StreamingAnswer(StreamedResponse(b'{"homeworks": [{"id": 1'))
+    with pytest.raises(ValueError):
+        list(answer.homeworks())
+
+
+def test_validators_come_from_headers():
+    answer = streamed({'homeworks': []}, headers={'ETag': '"abc"'})
+    assert answer.validators.etag == '"abc"'
+    assert answer.validators.digest is None
+
+
+def test_get_api_answer_streams_ok_response(homework_module, monkeypatch):
+    response = StreamedResponse(b'{"homeworks": []}')
+    response.status_code = 200
+
+    class Session:
+        def get(self, url, **kwargs):
+            return response
+
+    client = PracticumClient(
+        homework_module.ENDPOINT, session=Session(), stream=True
+    )
+    monkeypatch.setattr(homework_module, 'practicum_client', client)
+    answer = homework_module.get_api_answer(0)
+    assert isinstance(answer, StreamingAnswer)
+    assert answer.response is response
+
+
+def test_validate_streams_records_into_diff(homework_module):
+    answer = streamed({
+        'homeworks': [
+            {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'},
+            {'id': 2, 'homework_name': 'hw2.zip', 'status': 'unknown'},
+        ],
+        'current_date': 7,
+    })
+    counter = homework_module.VALIDATION_ERRORS
+    before = counter.value('ValueError')
+    transitions = diff_statuses({}, homework_module.validate(answer))
+    assert [transition.key for transition in transitions] == ['1']
+    assert counter.value('ValueError') == before + 1
+    assert answer['current_date'] == 7
+
+
+def peak_memory(process):
+    tracemalloc.start()
+    try:
+        result = process()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def test_streaming_peak_memory_is_below_full_decode(homework_module):
+    size = 5000
+    known = {str(number): 'approved' for number in range(size)}
+    body = b''.join(GeneratedResponse(size).iter_content(0))
+    answer = StreamingAnswer(GeneratedResponse(size))
+    transitions, streaming = peak_memory(
+        lambda: diff_statuses(known, homework_module.validate(answer))
+    )
+    _, decoding = peak_memory(lambda: diff_statuses(
+        known, homework_module.validate(json.loads(body))
+    ))
+    assert transitions == []
+    assert answer['current_date'] == 42
+    assert streaming < decoding / 3
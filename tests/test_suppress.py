@@ -0,0 +1,70 @@
+import logging
+
+from homework_bot.exceptions import APIConnectionError, TelegramError
+from homework_bot.suppress import DuplicateFilter, Suppressor
+from homework_bot.tenants import Tenant, tenant_context
+
+
+def make_record(level, msg, *args):
+    return logging.LogRecord('bot', level, __file__, 1, msg, args, None)
+
+
+def test_suppressor_counts_repeats_within_window(clock):
+    suppressor = Suppressor(60, clock=clock)
+    assert suppressor.check('a') == 0
+    assert suppressor.check('a') is None
+    assert suppressor.check('b') == 0
+    clock.now = 30
+    assert suppressor.check('a') is None
+    clock.now = 60
+    assert suppressor.check('a') == 2
+    assert suppressor.check('a') is None
+
+
+def test_suppressor_keeps_bounded_number_of_keys(clock):
+    suppressor = Suppressor(60, max_keys=3, clock=clock)
+    for key in range(10):
+        suppressor.check(key)
+    assert len(suppressor._entries) == 3
+    assert suppressor.check(9) is None
+    assert suppressor.check(0) == 0
+
+
+def test_duplicate_errors_are_logged_once_per_window(clock):
+    dedup = DuplicateFilter(300, clock=clock)
+    error = APIConnectionError('Нет ответа')
+    template = 'Сбой при опросе тенанта %s: %s'
+    passed = [
+        dedup.filter(make_record(logging.ERROR, template, name, error))
+        for name in ('a', 'b', 'c')
+    ]
+    assert passed == [True, False, False]
+    assert dedup.filter(make_record(logging.INFO, 'Начало запроса к API.'))
+    assert dedup.filter(make_record(logging.INFO, 'Начало запроса к API.'))
+    clock.now = 300
+    record = make_record(logging.ERROR, template, 'd', error)
+    assert dedup.filter(record)
+    assert record.getMessage() == (
+        'Сбой при опросе тенанта d: Нет ответа '
+        '(повторилось ещё 2 раз за 300 с)'
+    )
+
+
+def test_error_notification_is_sent_once_per_window(
+        monkeypatch, homework_module
+):
+    sent = []
+    monkeypatch.setattr(homework_module, 'ERROR_NOTIFY', '1')
+    monkeypatch.setattr(
+        homework_module, 'error_suppressor', Suppressor(3600)
+    )
+    monkeypatch.setattr(
+        homework_module, 'send_message',
+        lambda bot, message: sent.append(message)
+    )
+    error = APIConnectionError('Нет ответа')
+    for tenant in (Tenant('a', '1'), Tenant('a', '1'), Tenant('b', '2')):
+        with tenant_context(tenant):
+            homework_module.report_error(None, error)
+            homework_module.report_error(None, TelegramError('Ошибка'))
+    assert sent == ['Сбой в работе программы: Нет ответа'] * 2